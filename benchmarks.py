@@ -0,0 +1,309 @@
+# benchmarks.py — Timing + memory benchmarks for fetch → enrich → score → explain
+# Everything runs offline: Places calls go to an in-process MockPlaces (no sockets),
+# the OpenAI client is replaced by one that just sleeps, so numbers only reflect
+# this repo's code (plus the simulated latencies).
+#
+# Usage:
+#   python benchmarks.py                          # full run, JSON into .benchmarks/
+#   python benchmarks.py --quick --only score     # subset, fewer repeats
+#   python benchmarks.py --compare .benchmarks/<old>.json
+#
+# Each result holds per-call timings (min / median / mean, seconds) and the
+# tracemalloc peak of one extra call (peak_kib), measured separately so the
+# tracing overhead never pollutes the timings.
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import http_client
+import places_api
+import quota
+from engine import (USER_PROFILE, _cuisine_score, catalogue_version, generate_explanations,
+                    mode_rankings, rank_modes, score_restaurants, synthesize_profile)
+from mock_places import MockPlaces, generate_city
+from places_api import classify_cuisine, get_neighborhood, haversine_km, walk_minutes_for
+from restaurant import Restaurant
+from restaurant_store import get_store
+
+RESULTS_DIR       = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmarks")
+SCORE_SIZES       = (60, 1_000, 10_000, 100_000)
+HTTP_LATENCY      = 0.005    # seconds per stubbed Places call
+EXPLAIN_LATENCY   = 0.35     # seconds per simulated chat completion
+REGRESSION_FACTOR = 1.10     # --compare flags anything >10% slower
+
+
+class _StubResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self._body       = body
+        self.status_code = status_code
+
+    def json(self) -> dict:
+        return self._body
+
+
+class _StubSession:
+    """Drop-in for the pooled requests.Session that answers from a MockPlaces."""
+
+    def __init__(self, mock: MockPlaces):
+        self.mock = mock
+
+    def get(self, url: str, params: dict = None, timeout=None, **kw):
+        params   = params or {}
+        endpoint = next(e for e in ("nearbysearch", "details", "photo") if f"/{e}" in url)
+        if self.mock.fault(endpoint) == "OVER_QUERY_LIMIT":
+            return _StubResponse({"status": "OVER_QUERY_LIMIT"})
+        if endpoint == "nearbysearch":
+            return _StubResponse(self.mock.nearby(params))
+        return _StubResponse(self.mock.details(params))
+
+
+class _SleepyCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, **kw):
+        from types import SimpleNamespace
+        time.sleep(self.latency)
+        msg = SimpleNamespace(content="Matches your 15 Japanese visits and 4.6★ average")
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+class _SleepyClient:
+    def __init__(self, latency: float):
+        from types import SimpleNamespace
+        self.chat = SimpleNamespace(completions=_SleepyCompletions(latency))
+
+
+def to_restaurant(place: dict, lat: float = places_api.CENTER_LAT,
+                  lng: float = places_api.CENTER_LNG) -> Restaurant:
+    """Synthetic place → Restaurant without the details round trip."""
+    loc = place["geometry"]["location"]
+    d   = haversine_km(lat, lng, loc["lat"], loc["lng"])
+    return Restaurant.create(
+        name           = place["name"],
+        place_id       = place["place_id"],
+        cuisine        = classify_cuisine(place["types"], place["name"]),
+        neighborhood   = get_neighborhood(place["vicinity"]),
+        rating         = place["rating"],
+        reviews_count  = place["user_ratings_total"],
+        price_level    = place["price_level"],
+        distance_km    = d,
+        walk_minutes   = walk_minutes_for(d),
+        types          = place["types"],
+        opening_status = "open",
+        opening_hours  = "Open now",
+        photo_url      = "",
+        maps_url       = place["url"],
+        lat            = loc["lat"],
+        lng            = loc["lng"],
+    )
+
+
+def measure(fn, repeat: int = 5, number: int = 1, setup=None) -> dict:
+    """
+    Per-call time of fn() over `repeat` runs of `number` calls each, as min /
+    median / mean seconds (compare() gates on the median), plus one traced call
+    for peak memory.
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - t0) / number)
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min":      min(runs),
+        "median":   statistics.median(runs),
+        "mean":     statistics.fmean(runs),
+        "repeat":   repeat,
+        "number":   number,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _unlimited_quotas() -> tuple:
+    # Measure the pipeline, not the API quotas: every bucket effectively unlimited.
+    # Returns what _restore_quotas needs to put the real ones back.
+    prev = quota.QUOTAS, dict(quota._buckets)
+    quota.QUOTAS = {endpoint: (1e9, 10**9, 10**12) for endpoint in quota.QUOTAS}
+    quota._buckets.clear()
+    return prev
+
+
+def _restore_quotas(prev: tuple):
+    quota.QUOTAS = prev[0]
+    quota._buckets.clear()
+    quota._buckets.update(prev[1])
+
+
+def build_suite(quick: bool = False) -> dict:
+    """name → zero-arg callable returning that benchmark's result dict."""
+    rep      = 3 if quick else 7
+    profile  = synthesize_profile(USER_PROFILE)
+    city     = generate_city(max(SCORE_SIZES), radius_km=12.0, seed=11)
+    records  = [to_restaurant(p) for p in city]
+    sample   = records[:500]
+    suite    = {}
+
+    def _synth():
+        from engine import _profile_cache
+        _profile_cache.clear()
+        return synthesize_profile(USER_PROFILE)
+
+    suite["synthesize_profile/cold"] = lambda: measure(_synth, rep, 50)
+    suite["synthesize_profile/memo"] = lambda: measure(lambda: synthesize_profile(USER_PROFILE), rep, 1000)
+
+    for n in SCORE_SIZES:
+        cands = records[:n]
+        calls = max(1, 2000 // n)
+        suite[f"score_restaurants/{n}"] = (
+            lambda cands=cands, calls=calls: measure(lambda: score_restaurants(cands, profile, top_k=3), rep, calls)
+        )
+
+    cands_10k = records[:10_000]
+    version   = catalogue_version(cands_10k)
+    suite["rank_modes/10000"]          = lambda: measure(lambda: rank_modes(cands_10k, profile), rep, 1)
+    suite["mode_rankings/switch_10000"] = lambda: measure(
+        lambda: mode_rankings(cands_10k, profile, version).top("cafe", 9, fallback_mode="all"), rep, 200)
+
+    suite["_cuisine_score/x500"]  = lambda: measure(lambda: [_cuisine_score(r, profile) for r in sample], rep, 20)
+    suite["haversine_km/x500"]    = lambda: measure(
+        lambda: [haversine_km(41.387, 2.17, r.lat, r.lng) for r in sample], rep, 20)
+    suite["classify_cuisine/x500"] = lambda: measure(
+        lambda: [classify_cuisine(r.types, r.name) for r in sample], rep, 20)
+
+    def _load_all():
+        mock = MockPlaces(generate_city(3000, seed=7), latency=HTTP_LATENCY, token_delay=0.0)
+        prev_session, prev_delay = http_client._session, places_api.NEXT_PAGE_DELAY
+        prev_backend = http_client.ASYNC_BACKEND
+        prev_quotas  = _unlimited_quotas()
+        http_client._session, places_api.NEXT_PAGE_DELAY = _StubSession(mock), 0.0
+        http_client.ASYNC_BACKEND = "threads"   # async fetches go through the stub session too
+        http_client._async_clients.clear()
+        try:
+            return measure(
+                lambda: places_api.load_all_restaurants("bench-key", radius=1500),
+                max(2, rep // 2), 1, setup=get_store().invalidate,
+            )
+        finally:
+            http_client._session, places_api.NEXT_PAGE_DELAY = prev_session, prev_delay
+            http_client.ASYNC_BACKEND = prev_backend
+            http_client._async_clients.clear()
+            _restore_quotas(prev_quotas)
+            get_store().invalidate()
+
+    suite["load_all_restaurants/stubbed_http"] = _load_all
+
+    def _explain(warm: bool):
+        import engine
+        import explain_cache
+        top3 = score_restaurants(records[:60], profile, top_k=3)
+        prev_cache, prev_client = explain_cache._cache, engine._get_openai_client
+        explain_cache._cache    = explain_cache.ExplanationCache(":memory:")
+        engine._get_openai_client = lambda api_key: _SleepyClient(EXPLAIN_LATENCY)
+        prev_quotas = _unlimited_quotas()
+        try:
+            if warm:
+                generate_explanations(top3, profile, "bench-key")
+            setup = None if warm else explain_cache._cache.clear
+            return measure(lambda: generate_explanations(top3, profile, "bench-key"), max(2, rep // 2), 1, setup)
+        finally:
+            explain_cache._cache, engine._get_openai_client = prev_cache, prev_client
+            _restore_quotas(prev_quotas)
+
+    suite["generate_explanations/top3_cold"] = lambda: _explain(warm=False)
+    suite["generate_explanations/top3_warm"] = lambda: _explain(warm=True)
+    return suite
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def run(only: str = None, quick: bool = False) -> dict:
+    import numpy
+    suite   = build_suite(quick)
+    results = {}
+    for name, bench in suite.items():
+        if only and not fnmatch.fnmatch(name, f"*{only}*"):
+            continue
+        results[name] = bench()
+        r = results[name]
+        print(f"{name:<40} median {r['median'] * 1000:10.3f} ms   peak {r['peak_kib']:10.1f} KiB")
+    return {
+        "meta": {
+            "commit":    _git_commit(),
+            "created":   time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python":    platform.python_version(),
+            "numpy":     numpy.__version__,
+            "platform":  platform.platform(),
+            "quick":     quick,
+            "simulated": {"http_latency": HTTP_LATENCY, "explain_latency": EXPLAIN_LATENCY},
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Names whose median got more than REGRESSION_FACTOR slower than in `baseline`."""
+    slower = []
+    for name, r in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        ratio = r["median"] / old["median"] if old["median"] else float("inf")
+        mem   = r["peak_kib"] / old["peak_kib"] if old.get("peak_kib") else 1.0
+        flag  = "  REGRESSION" if ratio > REGRESSION_FACTOR else ""
+        print(f"{name:<40} time x{ratio:5.2f}   mem x{mem:5.2f}{flag}")
+        if flag:
+            slower.append(name)
+    return slower
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="For You pipeline benchmarks")
+    ap.add_argument("--only", help="run benchmarks whose name contains this pattern")
+    ap.add_argument("--quick", action="store_true", help="fewer repeats")
+    ap.add_argument("--out", help="JSON output path (default: .benchmarks/<time>-<commit>.json)")
+    ap.add_argument("--compare", help="previous JSON result to diff against")
+    args = ap.parse_args()
+
+    report = run(args.only, args.quick)
+    out    = args.out or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nvs {args.compare} ({baseline.get('meta', {}).get('commit', '?')}):")
+        return 1 if compare(report, baseline) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
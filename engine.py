@@ -3,6 +3,14 @@
 import random
 import math
 import json
+import heapq
+import threading
+import time
+
+import metrics
+import quota
+from restaurant import ScoredRestaurant
+from restaurant_store import freeze
 
 MIN_SCORE_THRESHOLD = 75
 
@@ -78,7 +86,37 @@ USER_PROFILE = {
 }
 
 
+PROFILE_CACHE_MAX = 64
+
+_profile_cache      = {}   # signals hash -> frozen profile, oldest first
+_profile_cache_lock = threading.Lock()
+
+
+def _signals_key(user: dict) -> str:
+    import hashlib
+    return hashlib.sha256(json.dumps(user, sort_keys=True, default=str).encode()).hexdigest()
+
+
 def synthesize_profile(user: dict) -> dict:
+    """
+    Profiles are memoized on a hash of the user's signals, so every request for
+    an unchanged user gets the same read-only profile and compiled tables.
+    """
+    key = _signals_key(user)
+    with _profile_cache_lock:
+        profile = _profile_cache.pop(key, None)
+        if profile is not None:
+            _profile_cache[key] = profile   # most recently used last
+    if profile is None:
+        profile = freeze(_synthesize_profile(user))   # shared by every caller
+        with _profile_cache_lock:
+            _profile_cache[key] = profile
+            while len(_profile_cache) > PROFILE_CACHE_MAX:
+                del _profile_cache[next(iter(_profile_cache))]
+    return profile
+
+
+def _synthesize_profile(user: dict) -> dict:
     raw_affinity = {}
     all_cuisines = set(list(user["reviewed_cuisines"].keys()) + list(user["visited_types"].keys()))
     for cuisine in all_cuisines:
@@ -113,7 +151,7 @@ def synthesize_profile(user: dict) -> dict:
     if any("natural wine" in s for s in user["search_history"]): tags.append("Natural wine")
     if any("ramen" in s for s in user["search_history"]):        tags.append("Ramen fan")
 
-    return {
+    profile = {
         "cuisine_affinity": cuisine_affinity,
         "price_preference": user["preferred_price_level"],
         "preferred_time":   user["preferred_time"],
@@ -122,26 +160,27 @@ def synthesize_profile(user: dict) -> dict:
         "disliked_types":   user.get("disliked_types", []),
         "raw_user":         user,
     }
+    profile["compiled"] = compile_profile(profile)
+    return profile
+
+
+VENUE_BLOCKER_TYPES = {"lodging","hotel","motel","spa","gym","beauty_salon",
+                       "clothing_store","store","tourist_attraction","museum","night_club"}
+
+# Candidate pools at least this large are scored on the NumPy path (vector_scoring.py)
+VECTORIZE_MIN_CANDIDATES = 500
 
 
 def is_food_venue(restaurant: dict) -> bool:
     types = set(restaurant.get("types", []))
     if not types.intersection(FOOD_TYPES):
         return False
-    blockers = {"lodging","hotel","motel","spa","gym","beauty_salon",
-                "clothing_store","store","tourist_attraction","museum","night_club"}
-    return not types.intersection(blockers)
+    return not types.intersection(VENUE_BLOCKER_TYPES)
 
 
-def _cuisine_score(restaurant: dict, profile: dict) -> float:
-    types = set(restaurant.get("types", []))
-    best  = 0.0
-    for place_type in types:
-        direct = profile["cuisine_affinity"].get(place_type, 0.0)
-        best = max(best, direct)
-        for affinity_key, mapped in CUISINE_TO_TYPES.items():
-            if place_type in mapped:
-                best = max(best, profile["cuisine_affinity"].get(affinity_key, 0.0))
+def _cuisine_score(restaurant: dict, profile: dict, compiled: "CompiledProfile" = None) -> float:
+    type_affinity = (compiled or compiled_profile(profile)).type_affinity
+    best = max((type_affinity.get(t, 0.0) for t in restaurant.get("types", [])), default=0.0)
     return round(best * 40, 2)
 
 
@@ -162,6 +201,24 @@ def _distance_score(restaurant: dict) -> float:
     return round(max(0.0, 10 - restaurant.get("distance_km", 0.0) * 3.2), 2)
 
 
+# ±JITTER points of score noise so refreshes surface different near-ties
+JITTER = 3.0
+
+
+def make_jitter_seed(user_id: str, session_id: str, refresh_count: int) -> str:
+    """Seed for reproducible jitter: stable within one refresh, different across refreshes."""
+    return f"{user_id}:{session_id}:{refresh_count}"
+
+
+def _jitter(restaurant: dict, seed: str = None) -> float:
+    if seed is None:
+        return random.uniform(-JITTER, JITTER)
+    import hashlib
+    key    = f"{seed}|{restaurant.get('place_id') or restaurant['name']}".encode()
+    unit   = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big") / 2**64
+    return (unit * 2 - 1) * JITTER
+
+
 # FIX #3: Replaced fake types ('meal_sitdown', 'fast_food') with real Places API types
 MODE_TYPE_FILTERS = {
     "date":   ({"restaurant", "bar", "food"},                              {"cafe", "bakery", "fast_food_restaurant", "meal_takeaway"}),
@@ -171,25 +228,82 @@ MODE_TYPE_FILTERS = {
 }
 
 
-def score_restaurants(restaurants: list, profile: dict, exclude: set = None, mode: str = "all") -> list:
-    exclude = exclude or set()
-    scored  = []
-    mode_req, mode_exc = MODE_TYPE_FILTERS.get(mode, (set(), set()))
+class CompiledProfile:
+    """
+    Scoring-ready view of a synthesized profile, built once per profile:
+    place_type -> best reachable affinity, the disliked set and the mode filters.
+    """
+
+    __slots__ = ("type_affinity", "disliked", "mode_filters")
+
+    def __init__(self, type_affinity: dict, disliked: frozenset, mode_filters: dict):
+        self.type_affinity = type_affinity
+        self.disliked      = disliked
+        self.mode_filters  = mode_filters
+
+
+def compile_profile(profile: dict) -> CompiledProfile:
+    affinity = profile["cuisine_affinity"]
+    # A type scores its own affinity or that of any cuisine mapping onto it, whichever is higher
+    type_affinity = dict(affinity)
+    for affinity_key, mapped in CUISINE_TO_TYPES.items():
+        for place_type in mapped:
+            type_affinity[place_type] = max(type_affinity.get(place_type, 0.0),
+                                            affinity.get(affinity_key, 0.0))
+    mode_filters = {m: (frozenset(req), frozenset(exc)) for m, (req, exc) in MODE_TYPE_FILTERS.items()}
+    return CompiledProfile(type_affinity, frozenset(profile.get("disliked_types", [])), mode_filters)
+
+
+def compiled_profile(profile: dict) -> CompiledProfile:
+    # Hand-built profiles (tests, notebooks) get compiled on the fly
+    return profile.get("compiled") or compile_profile(profile)
+
 
-    for r in restaurants:
+def _mode_match(types: set, mode_filter: tuple) -> bool:
+    mode_req, mode_exc = mode_filter
+    if mode_req and not types.intersection(mode_req):
+        return False
+    if mode_exc and types.intersection(mode_exc):
+        return False
+    return True
+
+
+def in_mode(restaurant: dict, mode: str) -> bool:
+    """True if the restaurant passes the type filter of `mode` (always for 'all')."""
+    return _mode_match(set(restaurant.get("types", [])), MODE_TYPE_FILTERS.get(mode, (set(), set())))
+
+
+def _scored_candidates(restaurants: list, profile: dict, exclude: set, mode: str,
+                       fallback_mode: str = None, jitter_seed: str = None) -> tuple:
+    """
+    One pass over the catalogue: filters, component scores, threshold and jitter.
+    Returns (primary, fallback) lists of (score, index, restaurant, components)
+    for `mode` and `fallback_mode`; fallback is empty when no fallback is asked for.
+    With a jitter_seed the jitter is a hash of (seed, place_id), so the same seed
+    always reproduces the same ranking.
+    """
+    exclude  = exclude or set()
+    compiled = compiled_profile(profile)
+    disliked = compiled.disliked
+    no_mode  = (frozenset(), frozenset())
+    primary_filter  = compiled.mode_filters.get(mode, no_mode)
+    fallback_filter = compiled.mode_filters.get(fallback_mode, no_mode) if fallback_mode else None
+    primary, fallback = [], []
+
+    for i, r in enumerate(restaurants):
         if r["name"] in exclude:
             continue
         if not is_food_venue(r):
             continue
         types = set(r.get("types", []))
-        if types.intersection(set(profile.get("disliked_types", []))):
+        if not disliked.isdisjoint(types):
             continue
-        if mode_req and not types.intersection(mode_req):
-            continue
-        if mode_exc and types.intersection(mode_exc):
+        in_primary  = _mode_match(types, primary_filter)
+        in_fallback = fallback_filter is not None and _mode_match(types, fallback_filter)
+        if not (in_primary or in_fallback):
             continue
 
-        c_cuisine  = _cuisine_score(r, profile)
+        c_cuisine  = _cuisine_score(r, profile, compiled)
         c_rating   = _rating_score(r)
         c_price    = _price_score(r, profile)
         c_distance = _distance_score(r)
@@ -199,40 +313,212 @@ def score_restaurants(restaurants: list, profile: dict, exclude: set = None, mod
             continue
 
         # FIX #6: Increased jitter to ±3.0 for better variety on refresh
-        jitter = random.uniform(-3.0, 3.0)
+        jitter = _jitter(r, jitter_seed)
         final  = round(min(raw + jitter, 99), 1)
 
-        r_copy = r.copy()
-        r_copy["score"] = final
-        r_copy["score_detail"] = {
-            "cuisine":  round(c_cuisine, 1),
-            "rating":   round(c_rating, 1),
-            "price":    round(c_price, 1),
-            "distance": round(c_distance, 1),
-        }
-        scored.append(r_copy)
-
-    return sorted(scored, key=lambda x: -x["score"])
-
-
-def generate_explanation(restaurant: dict, profile: dict, api_key: str) -> str:
-    if not api_key:
-        return _template_explanation(restaurant, profile)  # FIX #2: removed stray '301' arg
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-
-        price_map = {1: "budget", 2: "mid-range", 3: "upscale", 4: "fine dining"}
-        top_3     = sorted(profile["cuisine_affinity"].items(), key=lambda x: -x[1])[:3]
-        top_str   = ", ".join(
-            f"{k.replace('_restaurant','').replace('_',' ')} ({int(v*100)}%)"
-            for k, v in top_3
-        )
-        tags_str = ", ".join(profile["profile_tags"])
-        user     = profile.get("raw_user", {})
-        detail   = restaurant.get("score_detail", {})
-
-        prompt = f"""You are the Google Maps 'For You' AI engine.
+        cand = (final, i, r, (c_cuisine, c_rating, c_price, c_distance))
+        if in_primary:
+            primary.append(cand)
+        if in_fallback:
+            fallback.append(cand)
+
+    return primary, fallback
+
+
+def _candidate_pool(restaurants: list, profile: dict, exclude: set, mode: str,
+                    fallback_mode: str = None, jitter_seed: str = None) -> list:
+    if len(restaurants) >= VECTORIZE_MIN_CANDIDATES:
+        from vector_scoring import scored_candidates_np as scorer
+    else:
+        scorer = _scored_candidates
+    primary, fallback = scorer(restaurants, profile, exclude, mode, fallback_mode, jitter_seed)
+    return primary or fallback
+
+
+def _materialize(cand: tuple) -> ScoredRestaurant:
+    # The record is shared, not copied; score fields live on the slotted wrapper
+    final, _, r, (c_cuisine, c_rating, c_price, c_distance) = cand
+    return ScoredRestaurant(r, final, {
+        "cuisine":  round(c_cuisine, 1),
+        "rating":   round(c_rating, 1),
+        "price":    round(c_price, 1),
+        "distance": round(c_distance, 1),
+    })
+
+
+@metrics.timed("score")
+def score_restaurants(restaurants: list, profile: dict, exclude: set = None, mode: str = "all",
+                      top_k: int = None, fallback_mode: str = None, jitter_seed: str = None) -> list:
+    """
+    Ranked ScoredRestaurant views of the restaurants that pass the filters and
+    threshold. top_k keeps only the best k (bounded heap, only those k get wrapped).
+    fallback_mode is used when `mode` leaves nothing, without a second pass.
+    jitter_seed (see make_jitter_seed) makes the ranking reproducible.
+    """
+    pool = _candidate_pool(restaurants, profile, exclude, mode, fallback_mode, jitter_seed)
+    if top_k is None:
+        ranked = sorted(pool, key=lambda c: -c[0])
+    else:
+        ranked = heapq.nlargest(top_k, pool, key=lambda c: c[0])
+    return [_materialize(c) for c in ranked]
+
+
+# Per-mode rankings — one scoring pass serves every mode; cached per
+# (profile, catalogue version) so a mode switch is a lookup, not a rescore
+MODES                   = ("all",) + tuple(MODE_TYPE_FILTERS)
+MODE_RANKINGS_CACHE_MAX = 16
+
+_mode_rankings      = {}   # (profile key, catalogue version) -> ModeRankings, oldest first
+_mode_rankings_lock = threading.Lock()
+
+
+def profile_key(profile: dict) -> str:
+    """Hash of the profile fields scoring depends on."""
+    import hashlib
+    scored = (dict(profile["cuisine_affinity"]), profile["price_preference"],
+              list(profile.get("disliked_types", [])))
+    return hashlib.sha256(json.dumps(scored, sort_keys=True).encode()).hexdigest()
+
+
+def catalogue_version(restaurants: list) -> int:
+    """Content fingerprint of a catalogue: changes whenever any scored field does."""
+    return hash(tuple(
+        (r["place_id"] or r["name"], r["rating"], r["reviews_count"], r["price_level"],
+         r["distance_km"], tuple(r["types"]))
+        for r in restaurants
+    ))
+
+
+def _mode_candidates(restaurants: list, profile: dict) -> dict:
+    """mode -> [(raw, index, restaurant, components)] by raw score, ties in catalogue order."""
+    compiled = compiled_profile(profile)
+    disliked = compiled.disliked
+    no_mode  = (frozenset(), frozenset())
+    by_mode  = {m: [] for m in MODES}
+
+    for i, r in enumerate(restaurants):
+        if not is_food_venue(r):
+            continue
+        types = set(r.get("types", []))
+        if not disliked.isdisjoint(types):
+            continue
+        c_cuisine  = _cuisine_score(r, profile, compiled)
+        c_rating   = _rating_score(r)
+        c_price    = _price_score(r, profile)
+        c_distance = _distance_score(r)
+        raw        = c_cuisine + c_rating + c_price + c_distance
+        if raw < MIN_SCORE_THRESHOLD:
+            continue
+        cand = (raw, i, r, (c_cuisine, c_rating, c_price, c_distance))
+        for m in MODES:
+            if _mode_match(types, compiled.mode_filters.get(m, no_mode)):
+                by_mode[m].append(cand)
+
+    for cands in by_mode.values():
+        cands.sort(key=lambda c: (-c[0], c[1]))
+    return by_mode
+
+
+class ModeRankings:
+    """
+    Unjittered candidates of one catalogue for every mode, best first.
+    Exclusions and jitter are per request, so they are applied by top().
+    """
+
+    __slots__ = ("by_mode",)
+
+    def __init__(self, by_mode: dict):
+        self.by_mode = by_mode
+
+    def _pool(self, mode: str, top_k: int, exclude: set, jitter_seed: str) -> list:
+        # Jitter moves a score by at most JITTER either way, so past the k-th
+        # kept candidate only those within 2 * JITTER of it can still make the cut
+        pool, floor = [], None
+        for raw, i, r, comps in self.by_mode.get(mode, ()):
+            if floor is not None and raw < floor:
+                break
+            if r["name"] in exclude:
+                continue
+            pool.append((round(min(raw + _jitter(r, jitter_seed), 99), 1), i, r, comps))
+            if floor is None and top_k is not None and len(pool) == top_k:
+                floor = raw - 2 * JITTER - 0.1
+        return pool
+
+    def top(self, mode: str = "all", top_k: int = None, exclude: set = None,
+            fallback_mode: str = None, jitter_seed: str = None) -> list:
+        """Same result as score_restaurants() with the same arguments, without a rescore."""
+        exclude = exclude or set()
+        pool    = self._pool(mode, top_k, exclude, jitter_seed)
+        if not pool and fallback_mode:
+            pool = self._pool(fallback_mode, top_k, exclude, jitter_seed)
+        ranked = sorted(pool, key=lambda c: (-c[0], c[1]))
+        return [_materialize(c) for c in ranked[:top_k]]
+
+
+@metrics.timed("score")
+def rank_modes(restaurants: list, profile: dict) -> ModeRankings:
+    """Scores the catalogue once and ranks it for every mode."""
+    if len(restaurants) >= VECTORIZE_MIN_CANDIDATES:
+        from vector_scoring import mode_candidates_np
+        return ModeRankings(mode_candidates_np(restaurants, profile, MODES))
+    return ModeRankings(_mode_candidates(restaurants, profile))
+
+
+def mode_rankings(restaurants: list, profile: dict, version: int = None) -> ModeRankings:
+    """
+    Cached rank_modes(). Pass the catalogue `version` (see catalogue_version)
+    when it is already known, to make a repeat lookup O(1).
+    """
+    if version is None:
+        version = catalogue_version(restaurants)
+    key = (profile_key(profile), version)
+    with _mode_rankings_lock:
+        rankings = _mode_rankings.pop(key, None)
+        if rankings is not None:
+            _mode_rankings[key] = rankings   # most recently used last
+    metrics.incr("ranking_lookups", kind="rankings", result="miss" if rankings is None else "hit")
+    if rankings is None:
+        rankings = rank_modes(restaurants, profile)
+        with _mode_rankings_lock:
+            _mode_rankings[key] = rankings
+            while len(_mode_rankings) > MODE_RANKINGS_CACHE_MAX:
+                del _mode_rankings[next(iter(_mode_rankings))]
+    return rankings
+
+
+# Explanation generation — one shared OpenAI client per key, bounded concurrency,
+# request starts paced by the "chat" bucket in quota.py
+EXPLAIN_MODEL        = "gpt-4o-mini"
+EXPLAIN_WORKERS      = 3      # concurrent chat completions per batch
+EXPLAIN_TIMEOUT      = 8.0    # seconds per batch before falling back to templates
+EXPLAIN_PREFETCH     = 6      # the picks of the next two refreshes
+
+_openai_clients = {}
+_openai_lock    = threading.Lock()
+
+
+def _get_openai_client(api_key: str):
+    with _openai_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, timeout=EXPLAIN_TIMEOUT, max_retries=1)
+            _openai_clients[api_key] = client
+        return client
+
+
+def _explanation_prompt(restaurant: dict, profile: dict) -> str:
+    price_map = {1: "budget", 2: "mid-range", 3: "upscale", 4: "fine dining"}
+    top_3     = sorted(profile["cuisine_affinity"].items(), key=lambda x: -x[1])[:3]
+    top_str   = ", ".join(
+        f"{k.replace('_restaurant','').replace('_',' ')} ({int(v*100)}%)"
+        for k, v in top_3
+    )
+    tags_str = ", ".join(profile["profile_tags"])
+    user     = profile.get("raw_user", {})
+    detail   = restaurant.get("score_detail", {})
+
+    return f"""You are the Google Maps 'For You' AI engine.
 
 Write EXACTLY ONE sentence (max 18 words) explaining why {restaurant['name']}
 ({restaurant['cuisine']}, {restaurant['rating']}★, {price_map.get(restaurant.get('price_level',2), 'mid-range')},
@@ -251,19 +537,233 @@ Rules:
 - Sound like a smart friend who knows your taste
 - Output ONLY the sentence — no quotes, no trailing period"""
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
+
+@metrics.timed("explain")
+def _llm_explanation(restaurant: dict, profile: dict, api_key: str) -> str:
+    quota.acquire("chat")
+    try:
+        resp = _get_openai_client(api_key).chat.completions.create(
+            model=EXPLAIN_MODEL,
             max_tokens=60,
             temperature=0.7,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": _explanation_prompt(restaurant, profile)}]
         )
-        return resp.choices[0].message.content.strip().strip('"').rstrip(".")
     except Exception as e:
+        if getattr(e, "status_code", None) == 429:   # openai.RateLimitError
+            quota.record("chat", "OVER_QUERY_LIMIT")
+        raise
+    quota.record("chat", "OK")
+    return resp.choices[0].message.content.strip().strip('"').rstrip(".")
+
+
+def generate_explanation(restaurant: dict, profile: dict, api_key: str) -> str:
+    if not api_key:
+        return _template_explanation(restaurant, profile)  # FIX #2: removed stray '301' arg
+    from explain_cache import get_cache, explanation_key
+    cache  = get_cache()
+    key    = explanation_key(restaurant, profile, EXPLAIN_MODEL)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        text = _llm_explanation(restaurant, profile, api_key)
+        cache.put(key, text)
+        return text
+    except Exception as e:
+        metrics.incr("explain_errors")
         import streamlit as st
         st.warning(f"OpenAI error: {type(e).__name__}: {e}")
         return _template_explanation(restaurant, profile)
 
 
+def cached_explanations(restaurants: list, profile: dict, api_key: str) -> list:
+    """The cached LLM sentence for each restaurant, None where there is none yet."""
+    if not api_key:
+        return [None] * len(restaurants)
+    from explain_cache import get_cache, explanation_key
+    cache = get_cache()
+    return [cache.get(explanation_key(r, profile, EXPLAIN_MODEL)) for r in restaurants]
+
+
+def iter_explanation_batches(restaurants: list, profile: dict, api_key: str,
+                             max_workers: int = EXPLAIN_WORKERS,
+                             timeout: float = EXPLAIN_TIMEOUT, misses_only: bool = False):
+    """
+    Yields lists of (index, sentence) as explanations become available: all
+    cache hits at once, then every LLM answer that finished since the last
+    batch. `misses_only` skips the cache lookup for restaurants already known
+    to be misses (see cached_explanations). Items that error or miss the
+    `timeout` deadline are not yielded; callers keep whatever they were
+    showing (usually the template).
+    """
+    if not restaurants or not api_key:
+        return
+
+    from explain_cache import get_cache, explanation_key
+    cache   = get_cache()
+    keys    = [explanation_key(r, profile, EXPLAIN_MODEL) for r in restaurants]
+    hits    = []
+    missing = []
+    for i, key in enumerate(keys):
+        cached = None if misses_only else cache.get(key)
+        if cached is None:
+            missing.append(i)
+        else:
+            hits.append((i, cached))
+    if hits:
+        yield hits
+    if not missing:
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+    pool     = ThreadPoolExecutor(max_workers=min(max_workers, len(missing)))
+    futures  = {pool.submit(_llm_explanation, restaurants[i], profile, api_key): i for i in missing}
+    pending  = set(futures)
+    deadline = time.monotonic() + timeout
+    errors   = []
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                errors.append(FutureTimeout(f"{len(pending)} (of {len(futures)}) futures unfinished"))
+                metrics.incr("explain_timeouts")
+                break
+            batch = []
+            for fut in done:
+                i = futures[fut]
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                cache.put(keys[i], text)
+                batch.append((i, text))
+            if batch:
+                yield sorted(batch)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if errors:
+        metrics.incr("explain_errors", len(errors))
+        import streamlit as st
+        e = errors[0]
+        st.warning(f"OpenAI error ({len(errors)}/{len(missing)}): {type(e).__name__}: {e}")
+
+
+def iter_explanations(restaurants: list, profile: dict, api_key: str,
+                      max_workers: int = EXPLAIN_WORKERS,
+                      timeout: float = EXPLAIN_TIMEOUT):
+    """iter_explanation_batches() one (index, sentence) at a time."""
+    for batch in iter_explanation_batches(restaurants, profile, api_key, max_workers, timeout):
+        yield from batch
+
+
+class ExplanationPrefetch:
+    """
+    Generates explanations for likely next picks in the background, straight
+    into the explanation cache, so the next refresh finds them there. cancel()
+    drops everything not yet sent; completions already in flight still land
+    in the cache.
+    """
+
+    def __init__(self, restaurants: list, profile: dict, api_key: str,
+                 max_workers: int = EXPLAIN_WORKERS):
+        self.restaurants = list(restaurants)
+        self.profile     = profile
+        self.api_key     = api_key
+        self.max_workers = max_workers
+        self._cancelled  = threading.Event()
+        self._pool       = None
+        self._futures    = []
+        self._thread     = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self) -> "ExplanationPrefetch":
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+        dropped = sum(f.cancel() for f in list(self._futures))
+        if dropped:
+            metrics.incr("explain_prefetch", dropped, result="cancelled")
+        pool = self._pool
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def join(self, timeout: float = None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from explain_cache import get_cache, explanation_key
+        cache   = get_cache()
+        missing = []
+        for r in self.restaurants:
+            key = explanation_key(r, self.profile, EXPLAIN_MODEL)
+            if cache.get(key) is None:
+                missing.append((r, key))
+        if not missing or self.cancelled:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing)))
+        try:
+            for r, key in missing:   # rank order: the next refresh page first
+                self._futures.append(self._pool.submit(self._one, r, key, cache))
+        except RuntimeError:
+            pass                     # cancelled while submitting
+        self._pool.shutdown(wait=True)
+
+    def _one(self, restaurant: dict, key: str, cache):
+        if self.cancelled:
+            return
+        try:
+            with quota.lane(quota.BACKGROUND):   # behind user-facing calls, shed under pressure
+                text = _llm_explanation(restaurant, self.profile, self.api_key)
+        except quota.QuotaExceeded:
+            metrics.incr("explain_prefetch", result="shed")
+            return
+        except Exception:
+            metrics.incr("explain_prefetch", result="error")   # the refresh will just ask again
+            return
+        cache.put(key, text)
+        metrics.incr("explain_prefetch", result="generated")
+
+
+def prefetch_explanations(restaurants: list, profile: dict, api_key: str) -> ExplanationPrefetch | None:
+    """
+    Starts an ExplanationPrefetch for `restaurants`; None if there is nothing
+    to do or the chat quota is under pressure.
+    """
+    if not restaurants or not api_key or quota.shed("chat"):
+        return None
+    return ExplanationPrefetch(restaurants, profile, api_key).start()
+
+
+def template_explanations(restaurants: list, profile: dict) -> list:
+    """Instant, model-free sentences to show while the LLM ones are pending."""
+    return [_template_explanation(r, profile) for r in restaurants]
+
+
+def generate_explanations(restaurants: list, profile: dict, api_key: str,
+                          max_workers: int = EXPLAIN_WORKERS,
+                          timeout: float = EXPLAIN_TIMEOUT) -> list:
+    """
+    Batch version of generate_explanation: cached sentences are served from the
+    explanation cache, the rest run concurrently on one shared client behind the
+    rate limiter. Returns one sentence per restaurant, in input order; any item
+    that errors or exceeds `timeout` gets its (uncached) template.
+    """
+    results = [None] * len(restaurants)
+    for i, text in iter_explanations(restaurants, profile, api_key, max_workers, timeout):
+        results[i] = text
+    return [text if text is not None else _template_explanation(r, profile)
+            for r, text in zip(restaurants, results)]
+
+
 def _template_explanation(restaurant: dict, profile: dict) -> str:
     types = set(restaurant.get("types", []))
     templates = {
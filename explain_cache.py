@@ -0,0 +1,127 @@
+# explain_cache.py — Disk-backed cache for LLM explanations (SQLite, TTL + LRU)
+# Key: hash of the restaurant fields used in the prompt, the profile fingerprint
+# (cuisine affinities + tags) and the model name.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+
+CACHE_PATH        = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "explanations.sqlite3")
+CACHE_TTL         = 7 * 24 * 3600   # seconds an explanation stays valid
+CACHE_MAX_ENTRIES = 5000            # least-recently-used rows beyond this are evicted
+
+# Restaurant fields that feed _explanation_prompt — anything else can change freely
+PROMPT_FIELDS = ("name", "place_id", "cuisine", "rating", "price_level", "neighborhood", "walk_minutes")
+
+
+def profile_fingerprint(profile: dict) -> str:
+    payload = {
+        "cuisine_affinity": dict(profile.get("cuisine_affinity", {})),
+        "profile_tags":     list(profile.get("profile_tags", [])),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def explanation_key(restaurant: dict, profile: dict, model: str) -> str:
+    payload = {
+        "restaurant": {f: restaurant.get(f) for f in PROMPT_FIELDS},
+        "cuisine":    restaurant.get("score_detail", {}).get("cuisine", 0),
+        "profile":    profile_fingerprint(profile),
+        "model":      model,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ExplanationCache:
+    """Thread-safe SQLite store with TTL expiry, LRU eviction and hit/miss counters."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.path        = path
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self.hits        = 0
+        self.misses      = 0
+        self._lock       = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS explanations ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON explanations(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created FROM explanations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM explanations WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                metrics.incr("explain_cache_lookups", result="miss")
+                return None
+            self._conn.execute("UPDATE explanations SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            metrics.incr("explain_cache_lookups", result="hit")
+            return row[0]
+
+    def put(self, key: str, text: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO explanations (key, text, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, text, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM explanations WHERE created < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM explanations WHERE key IN ("
+            " SELECT key FROM explanations ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM explanations")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries":  size,
+        }
+
+
+_cache      = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ExplanationCache:
+    """Process-wide cache instance, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExplanationCache()
+    return _cache
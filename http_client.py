@@ -0,0 +1,207 @@
+# http_client.py — Shared keep-alive HTTP session for Google Places / Geocode calls
+# One pooled requests.Session per process, so repeated calls reuse TCP+TLS connections.
+# The async side runs on one process-wide event loop (see run_sync) with one
+# pooled httpx.AsyncClient; without httpx installed it falls back to running the
+# pooled session in worker threads.
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+import quota
+
+POOL_SIZE     = 16     # connections kept alive per host (>= ENRICH_WORKERS)
+ASYNC_POOL    = 256    # max open connections on the async client (many tiles in flight)
+MAX_RETRIES   = 3      # retries after the first attempt
+BACKOFF_BASE  = 0.5    # seconds, doubled on every retry
+BACKOFF_CAP   = 8.0    # seconds, upper bound for a single backoff sleep
+
+# Read timeouts per endpoint (seconds); connect timeout is shared
+CONNECT_TIMEOUT   = 3.05
+ENDPOINT_TIMEOUTS = {
+    "nearbysearch": 10.0,
+    "details":      10.0,
+    "photo":        15.0,
+    "geocode":      8.0,
+}
+DEFAULT_TIMEOUT = 10.0
+
+# Google returns HTTP 200 with these statuses when the call is worth retrying
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+# "httpx", "threads" (pooled requests session in worker threads) or "auto"
+ASYNC_BACKEND = os.environ.get("FORYOU_ASYNC_BACKEND", "auto")
+
+_session      = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s       = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _decode(resp, endpoint: str) -> tuple:
+    # (data, retry) for one HTTP response; shared by the sync and async paths
+    if resp.status_code >= 500:
+        data = {"status": f"HTTP_{resp.status_code}"}
+        metrics.incr("http_requests", endpoint=endpoint, status=data["status"])
+        return data, True
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {"status": f"HTTP_{resp.status_code}"}
+    metrics.incr("http_requests", endpoint=endpoint, status=data.get("status", f"HTTP_{resp.status_code}"))
+    quota.record(endpoint, data.get("status"))   # OVER_QUERY_LIMIT starts a cooldown for everyone
+    return data, data.get("status") in RETRY_API_STATUSES
+
+
+# ── Async ─────────────────────────────────────────────────────────────────────
+
+class ThreadedAsyncClient:
+    """Async facade over the pooled requests session: each GET runs in a worker thread."""
+
+    network_errors = (requests.ConnectionError, requests.Timeout)
+
+    async def get(self, url: str, params: dict, timeout: tuple):
+        return await asyncio.to_thread(get_session().get, url, params=params, timeout=timeout)
+
+
+class HttpxAsyncClient:
+    """One pooled httpx.AsyncClient: hundreds of requests in flight on a single thread."""
+
+    def __init__(self):
+        import httpx
+        self._httpx         = httpx
+        self._client        = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=ASYNC_POOL, max_keepalive_connections=POOL_SIZE))
+        self.network_errors = (httpx.TransportError,)
+
+    async def get(self, url: str, params: dict, timeout: tuple):
+        connect, read = timeout
+        return await self._client.get(url, params=params,
+                                      timeout=self._httpx.Timeout(read, connect=connect))
+
+
+_async_clients = weakref.WeakKeyDictionary()   # event loop -> client (httpx clients are loop-bound)
+
+
+def get_async_client():
+    """The async client for the running loop, per ASYNC_BACKEND (httpx when installed)."""
+    loop   = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = ThreadedAsyncClient()
+        if ASYNC_BACKEND != "threads":
+            try:
+                client = HttpxAsyncClient()
+            except ImportError:
+                if ASYNC_BACKEND == "httpx":
+                    raise
+        _async_clients[loop] = client
+    return client
+
+
+async def aget_json(url: str, params: dict, endpoint: str, timeout: float = None) -> dict:
+    """
+    GET `url` through the async client and return the decoded JSON body.
+    Retries with jittered exponential backoff on connection errors, timeouts,
+    HTTP 5xx and OVER_QUERY_LIMIT / UNKNOWN_ERROR API statuses. Once retries are
+    exhausted the last response body is returned (callers check `status`), or
+    the last network exception is raised. Every attempt first takes a token
+    from the endpoint's quota (see quota.py); a call the quota refuses returns
+    {"status": "OVER_QUERY_LIMIT" | "OVER_DAILY_LIMIT"} without being sent.
+    """
+    read_timeout = timeout or ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    client       = get_async_client()
+    last_exc     = None
+    data         = {}
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            metrics.incr("http_retries", endpoint=endpoint)
+            await asyncio.sleep(_backoff(attempt - 1))
+        try:
+            await quota.aacquire(endpoint)
+        except quota.QuotaExceeded as e:
+            return {"status": e.status}
+        t0 = time.perf_counter()
+        try:
+            resp = await client.get(url, params=params, timeout=(CONNECT_TIMEOUT, read_timeout))
+        except client.network_errors as e:
+            metrics.incr("http_requests", endpoint=endpoint, status=type(e).__name__)
+            last_exc = e
+            continue
+        finally:
+            metrics.observe("http_request", time.perf_counter() - t0, endpoint=endpoint)
+        last_exc    = None
+        data, retry = _decode(resp, endpoint)
+        if not retry:
+            break
+    if last_exc is not None:
+        raise last_exc
+    return data
+
+
+_loop      = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop all async Places work runs on, started on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                from concurrent.futures import ThreadPoolExecutor
+                loop = asyncio.new_event_loop()
+                # Worker threads for the ThreadedAsyncClient fallback, one per pooled connection
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="places-io"))
+                threading.Thread(target=loop.run_forever, name="places-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def _in_context(coro, values: list):
+    # Runs `coro` with the caller's context variables (e.g. the quota lane) set
+    for var, value in values:
+        var.set(value)
+    return await coro
+
+
+def run_sync(coro, timeout: float = None):
+    """
+    Runs `coro` on the shared loop and blocks for its result (the sync API's
+    bridge). The caller's context variables, such as its quota lane, carry over.
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the shared loop; await the coroutine instead")
+    values = list(contextvars.copy_context().items())
+    return asyncio.run_coroutine_threadsafe(_in_context(coro, values), loop).result(timeout)
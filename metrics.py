@@ -0,0 +1,236 @@
+# metrics.py — Process-wide timers and counters for the recommendation pipeline
+# Cheap enough for hot paths (one lock + a few adds per observation). Exported as
+# Prometheus text, a JSON dump, and a compact per-stage summary for the sheet's
+# pipeline view.
+#
+#   FORYOU_METRICS_PORT=9464 streamlit run app.py   → curl localhost:9464/metrics
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX       = "foryou_"
+METRICS_PORT = os.environ.get("FORYOU_METRICS_PORT", "")
+
+# Stage timers shown in the pipeline view, in pipeline order
+PIPELINE_STAGES = (
+    ("nearby_search", "Places Nearby Search"),
+    ("place_details", "Place Details"),
+    ("enrich",        "Enrichment"),
+    ("score",         "Scoring"),
+    ("explain",       "Explanations (LLM)"),
+)
+
+
+class Registry:
+    """
+    Counters and timers keyed by (name, sorted label pairs). Timers keep count,
+    total, max and the latest observation, which is all the views below need.
+    """
+
+    def __init__(self):
+        self.started  = time.time()
+        self.counters = {}
+        self.timers   = {}   # key -> [count, total_s, max_s, last_s]
+        self._lock    = threading.Lock()
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            t = self.timers.get(key)
+            if t is None:
+                self.timers[key] = [1, seconds, seconds, seconds]
+            else:
+                t[0] += 1
+                t[1] += seconds
+                t[2]  = max(t[2], seconds)
+                t[3]  = seconds
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.timers.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.counters.items()]
+            timers   = [
+                {"name": n, "labels": dict(l), "count": t[0], "total_s": round(t[1], 6),
+                 "max_s": round(t[2], 6), "last_s": round(t[3], 6)}
+                for (n, l), t in self.timers.items()
+            ]
+        return {"uptime_s": round(time.time() - self.started, 1), "counters": counters, "timers": timers}
+
+
+registry = Registry()
+incr     = registry.incr
+observe  = registry.observe
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """with timer("score"): ... — records the block's wall time under `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+def timed(name: str, **labels):
+    """Decorator form of timer()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kw)
+            finally:
+                observe(name, time.perf_counter() - t0, **labels)
+        return inner
+    return wrap
+
+
+def _cache_gauges() -> dict:
+    # Read from the caches themselves so hit rates survive a metrics reset
+    from restaurant_store import get_store
+    gauges = {f"store_{k}": v for k, v in get_store().stats().items()}
+    import explain_cache
+    if explain_cache._cache is not None:   # don't open the SQLite file just to report on it
+        gauges.update({f"explain_cache_{k}": v for k, v in explain_cache._cache.stats().items()})
+    import quota
+    for endpoint, st in quota.status().items():
+        gauges.update({f"quota_{endpoint}_{k}": v for k, v in st.items()})
+    return gauges
+
+
+def to_json() -> str:
+    data = registry.snapshot()
+    data["gauges"] = _cache_gauges()
+    return json.dumps(data, indent=2)
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def to_prometheus() -> str:
+    """Prometheus text exposition format (counters, summaries, gauges)."""
+    snap  = registry.snapshot()
+    lines = []
+    typed = set()
+
+    def _type(name: str, kind: str):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for c in sorted(snap["counters"], key=lambda c: c["name"]):
+        _type(f"{PREFIX}{c['name']}_total", "counter")
+        lines.append(f"{PREFIX}{c['name']}_total{_labels(c['labels'])} {c['value']}")
+    for t in sorted(snap["timers"], key=lambda t: t["name"]):
+        base = f"{PREFIX}{t['name']}_seconds"
+        _type(base, "summary")
+        lines.append(f"{base}_count{_labels(t['labels'])} {t['count']}")
+        lines.append(f"{base}_sum{_labels(t['labels'])} {t['total_s']}")
+    for t in sorted(snap["timers"], key=lambda t: t["name"]):
+        _type(f"{PREFIX}{t['name']}_seconds_max", "gauge")
+        lines.append(f"{PREFIX}{t['name']}_seconds_max{_labels(t['labels'])} {t['max_s']}")
+    for name, value in sorted(_cache_gauges().items()):
+        _type(f"{PREFIX}{name}", "gauge")
+        lines.append(f"{PREFIX}{name} {value}")
+    lines.append(f"{PREFIX}uptime_seconds {snap['uptime_s']}")
+    return "\n".join(lines) + "\n"
+
+
+def pipeline_summary() -> dict:
+    """Per-stage calls / avg / last / max (ms), cache hit rates, HTTP statuses and quotas."""
+    import quota
+    snap   = registry.snapshot()
+    stages = []
+    for name, label in PIPELINE_STAGES:
+        ts    = [t for t in snap["timers"] if t["name"] == name]
+        count = sum(t["count"] for t in ts)
+        total = sum(t["total_s"] for t in ts)
+        stages.append({
+            "stage":   label,
+            "calls":   count,
+            "avg_ms":  round(total / count * 1000, 1) if count else 0.0,
+            "last_ms": round(max((t["last_s"] for t in ts), default=0.0) * 1000, 1),
+            "max_ms":  round(max((t["max_s"] for t in ts), default=0.0) * 1000, 1),
+        })
+    lookups = {}
+    for c in snap["counters"]:
+        if c["name"] in ("store_lookups", "explain_cache_lookups", "ranking_lookups"):
+            kind = c["labels"].get("kind", "explanations")
+            hit_miss = lookups.setdefault(kind, [0, 0])
+            hit_miss[0 if c["labels"].get("result") in ("hit", "stale") else 1] += c["value"]
+    http = {}
+    for c in snap["counters"]:
+        if c["name"] == "http_requests":
+            key = f"{c['labels'].get('endpoint')} {c['labels'].get('status')}"
+            http[key] = http.get(key, 0) + c["value"]
+    return {
+        "stages":   stages,
+        "caches":   {k: {"hits": h, "misses": m, "hit_rate": round(h / (h + m), 3) if h + m else 0.0}
+                     for k, (h, m) in sorted(lookups.items())},
+        "http":     dict(sorted(http.items())),
+        "quota":    quota.status(),
+        "uptime_s": snap["uptime_s"],
+    }
+
+
+_server      = None
+_server_lock = threading.Lock()
+
+
+def serve(port: int, host: str = "127.0.0.1"):
+    """Starts (once per process) a background /metrics (Prometheus) + /metrics.json endpoint."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = to_json().encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = to_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), Handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    """serve() on FORYOU_METRICS_PORT, if set; a taken port is not fatal."""
+    if METRICS_PORT:
+        try:
+            serve(int(METRICS_PORT))
+        except (OSError, ValueError):
+            pass
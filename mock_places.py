@@ -0,0 +1,315 @@
+# mock_places.py — Local stand-in for the Google Places endpoints used by places_api.py
+# Serves nearbysearch/json, details/json and photo from a synthetic city, with
+# configurable latency, error injection and Google's next_page_token semantics,
+# so the whole stack can be load-tested without spending quota.
+#
+# Usage:
+#   python mock_places.py --places 5000 --latency-ms 120 --over-query-limit 0.02
+#   PLACES_BASE=http://127.0.0.1:8765/maps/api/place PLACES_NEXT_PAGE_DELAY=0.2 streamlit run app.py
+
+import argparse
+import json
+import math
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from places_api import CENTER_LAT, CENTER_LNG, KM_PER_DEG_LAT, haversine_km
+
+PAGE_SIZE      = 20
+MAX_RESULTS    = 60      # Google stops after 3 pages
+TOKEN_DELAY    = 2.0     # seconds before a next_page_token becomes valid
+TOKEN_TTL      = 120.0   # seconds a next_page_token stays usable
+HANG_SECONDS   = 30.0    # how long an injected timeout keeps the request open
+
+NEIGHBORHOODS = ("Eixample", "Gràcia", "El Born", "Barri Gòtic", "El Raval", "Poble-sec",
+                 "Sant Antoni", "Barceloneta", "Poblenou", "Sants", "Les Corts", "Sarrià")
+STREETS       = ("Carrer de Mallorca", "Carrer de Provença", "Carrer del Consell de Cent",
+                 "Carrer d'Aragó", "Carrer de Verdi", "Carrer de Blai", "Carrer del Parlament",
+                 "Passeig de Gràcia", "Rambla del Poblenou", "Carrer de Sant Pere Més Alt")
+
+# (weight, types, name words) — mirrors the mix Nearby Search returns for type=restaurant
+VENUE_KINDS = (
+    (14, ["spanish_restaurant", "restaurant", "food"],       ("Bodega", "Taverna", "Tasca", "Casa")),
+    (10, ["bar", "restaurant", "food"],                      ("Bar", "Tapas", "Vermuteria")),
+    (7,  ["italian_restaurant", "restaurant", "food"],       ("Trattoria", "Osteria", "Pasta")),
+    (5,  ["pizza_restaurant", "restaurant", "food"],         ("Pizzeria", "Forno")),
+    (6,  ["japanese_restaurant", "restaurant", "food"],      ("Izakaya", "Tokyo", "Nippon")),
+    (3,  ["sushi_restaurant", "restaurant", "food"],         ("Sushi", "Omakase")),
+    (3,  ["ramen_restaurant", "restaurant", "food"],         ("Ramen", "Noodle House")),
+    (6,  ["mediterranean_restaurant", "restaurant", "food"], ("Mar", "Olivera", "Terra")),
+    (5,  ["seafood_restaurant", "restaurant", "food"],       ("Marisqueria", "Peix", "La Mar")),
+    (3,  ["french_restaurant", "restaurant", "food"],        ("Bistrot", "Brasserie")),
+    (3,  ["chinese_restaurant", "restaurant", "food"],       ("Dragon", "Jardí de Jade")),
+    (3,  ["thai_restaurant", "restaurant", "food"],          ("Bangkok", "Thai Orchid")),
+    (3,  ["indian_restaurant", "restaurant", "food"],        ("Tandoor", "Masala")),
+    (3,  ["mexican_restaurant", "restaurant", "food"],       ("Taquería", "Cantina")),
+    (2,  ["american_restaurant", "restaurant", "food"],      ("Diner", "Burger Joint")),
+    (2,  ["steak_house", "restaurant", "food"],              ("Brasa", "Asador")),
+    (2,  ["vegetarian_restaurant", "restaurant", "food"],    ("Verd", "Green Spot")),
+    (1,  ["vegan_restaurant", "restaurant", "food"],         ("Vegan Bar", "Planta")),
+    (5,  ["cafe", "restaurant", "food"],                     ("Café", "Coffee Lab", "Granja")),
+    (2,  ["bakery", "restaurant", "food"],                   ("Forn", "Pastisseria")),
+    (3,  ["fast_food_restaurant", "restaurant", "food"],     ("Express", "Döner", "Bocata")),
+    (2,  ["restaurant", "food", "lodging"],                  ("Hotel Restaurant", "Hostal")),
+    (1,  ["night_club", "bar", "restaurant"],                ("Club", "Sala")),
+)
+BASE_TYPES = ["point_of_interest", "establishment"]
+
+
+def generate_city(n: int = 3000, center_lat: float = CENTER_LAT, center_lng: float = CENTER_LNG,
+                  radius_km: float = 4.0, seed: int = 7) -> list:
+    """
+    `n` synthetic places in Places Details shape, denser towards the centre.
+    Deterministic for a given seed, so load-test runs are comparable.
+    """
+    rng     = random.Random(seed)
+    weights = [k[0] for k in VENUE_KINDS]
+    places  = []
+    for i in range(n):
+        _, types, words = rng.choices(VENUE_KINDS, weights=weights)[0]
+        d_km    = radius_km * math.sqrt(rng.random()) ** 1.5
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat     = center_lat + d_km * math.cos(bearing) / KM_PER_DEG_LAT
+        lng     = center_lng + d_km * math.sin(bearing) / (KM_PER_DEG_LAT * math.cos(math.radians(center_lat)))
+        close   = rng.choice(("2300", "0000", "0100", "1600"))
+        places.append({
+            "place_id":           f"mock_{seed}_{i:06d}",
+            "name":               f"{rng.choice(words)} {rng.choice(NEIGHBORHOODS).split()[-1]} {i}",
+            "rating":             round(min(5.0, max(2.5, rng.gauss(4.25, 0.35))), 1),
+            "user_ratings_total": int(rng.lognormvariate(5.3, 1.1)),
+            "price_level":        rng.choices((1, 2, 3, 4), weights=(3, 5, 3, 1))[0],
+            "types":              types + BASE_TYPES,
+            "vicinity":           f"{rng.choice(STREETS)} {rng.randint(1, 300)}, {rng.choice(NEIGHBORHOODS)}, Barcelona",
+            "geometry":           {"location": {"lat": round(lat, 7), "lng": round(lng, 7)}},
+            "photos":             [{"photo_reference": f"photo_{seed}_{i:06d}", "width": 800, "height": 600}],
+            "opening_hours":      {
+                "open_now": rng.random() < 0.8,
+                "periods":  [{"open": {"day": d, "time": "1200"}, "close": {"day": d, "time": close}}
+                             for d in range(7)],
+            },
+            "url":                f"https://maps.google.com/?cid=mock{i}",
+        })
+    return places
+
+
+def _prominence(place: dict) -> float:
+    return place["rating"] * math.log1p(place["user_ratings_total"])
+
+
+class MockPlaces:
+    """
+    Endpoint behaviour, independent of HTTP: search, details, photo, plus the
+    latency / error knobs. Rates are probabilities per request.
+    """
+
+    def __init__(self, places: list, latency: float = 0.0, jitter: float = 0.0,
+                 over_query_limit: float = 0.0, timeout_rate: float = 0.0, error_rate: float = 0.0,
+                 token_delay: float = TOKEN_DELAY, seed: int = 0):
+        self.places           = {p["place_id"]: p for p in places}
+        self.latency          = latency
+        self.jitter           = jitter
+        self.over_query_limit = over_query_limit
+        self.timeout_rate     = timeout_rate
+        self.error_rate       = error_rate
+        self.token_delay      = token_delay
+        self.counts           = {}
+        self._rng             = random.Random(seed)
+        self._tokens          = {}   # token -> (remaining results, valid_from)
+        self._lock            = threading.Lock()
+
+    def fault(self, endpoint: str) -> str | None:
+        """Sleeps the configured latency and picks the fault (if any) for this request."""
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            roll  = self._rng.random()
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        if roll < self.timeout_rate:
+            return "timeout"
+        roll -= self.timeout_rate
+        if roll < self.error_rate:
+            return "http_500"
+        roll -= self.error_rate
+        if roll < self.over_query_limit:
+            return "OVER_QUERY_LIMIT"
+        return None
+
+    def nearby(self, params: dict) -> dict:
+        if not params.get("key"):
+            return {"status": "REQUEST_DENIED", "results": [], "error_message": "The provided API key is invalid."}
+        token = params.get("pagetoken")
+        if token:
+            with self._lock:
+                entry = self._tokens.get(token)
+            now = time.time()
+            if entry is None or now < entry[1] or now > entry[1] + TOKEN_TTL:
+                return {"status": "INVALID_REQUEST", "results": []}
+            with self._lock:
+                self._tokens.pop(token, None)
+            return self._page(entry[0])
+        try:
+            lat, lng = (float(v) for v in params["location"].split(","))
+            radius   = float(params["radius"])
+        except (KeyError, ValueError):
+            return {"status": "INVALID_REQUEST", "results": []}
+        wanted = params.get("type")
+        hits   = [
+            p for p in self.places.values()
+            if (not wanted or wanted in p["types"])
+            and haversine_km(lat, lng, p["geometry"]["location"]["lat"],
+                             p["geometry"]["location"]["lng"]) * 1000 <= radius
+        ]
+        hits.sort(key=_prominence, reverse=True)
+        if not hits:
+            return {"status": "ZERO_RESULTS", "results": []}
+        return self._page(hits[:MAX_RESULTS])
+
+    def _page(self, results: list) -> dict:
+        page, rest = results[:PAGE_SIZE], results[PAGE_SIZE:]
+        body = {"status": "OK", "results": [_nearby_shape(p) for p in page]}
+        if rest:
+            token = secrets.token_urlsafe(24)
+            with self._lock:
+                self._tokens[token] = (rest, time.time() + self.token_delay)
+            body["next_page_token"] = token
+        return body
+
+    def details(self, params: dict) -> dict:
+        if not params.get("key"):
+            return {"status": "REQUEST_DENIED", "error_message": "The provided API key is invalid."}
+        place = self.places.get(params.get("place_id", ""))
+        if place is None:
+            return {"status": "NOT_FOUND"}
+        fields = params.get("fields")
+        if fields:
+            wanted = {f.strip().split("/")[0] for f in fields.split(",")}
+            place  = {k: v for k, v in place.items() if k in wanted}
+        return {"status": "OK", "result": place}
+
+    def photo(self, params: dict) -> bytes:
+        ref  = params.get("photo_reference", "")
+        hue  = sum(ref.encode()) % 360
+        return (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600">'
+            f'<rect width="800" height="600" fill="hsl({hue},45%,45%)"/></svg>'
+        ).encode()
+
+
+def _nearby_shape(place: dict) -> dict:
+    # Nearby Search returns a subset of the Details fields
+    keys = ("place_id", "name", "rating", "user_ratings_total", "price_level",
+            "types", "vicinity", "geometry", "photos")
+    out  = {k: place[k] for k in keys if k in place}
+    out["opening_hours"] = {"open_now": place["opening_hours"]["open_now"]}
+    return out
+
+
+def _handler(mock: MockPlaces):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real API
+
+        def do_GET(self):
+            url    = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            path   = url.path.rstrip("/")
+            if path.endswith("/stats"):
+                return self._send(200, json.dumps(mock.counts).encode(), "application/json")
+            endpoint = next((e for e in ("nearbysearch", "details", "photo") if f"/{e}" in path), None)
+            if endpoint is None:
+                return self._send(404, b'{"status": "NOT_FOUND"}', "application/json")
+            fault = mock.fault(endpoint)
+            if fault == "timeout":
+                time.sleep(HANG_SECONDS)
+                return self._send(504, b"", "text/plain")
+            if fault == "http_500":
+                return self._send(500, b'{"status": "UNKNOWN_ERROR"}', "application/json")
+            if fault == "OVER_QUERY_LIMIT":
+                return self._send(200, b'{"status": "OVER_QUERY_LIMIT", "results": []}', "application/json")
+            if endpoint == "photo":
+                return self._send(200, mock.photo(params), "image/svg+xml")
+            body = mock.nearby(params) if endpoint == "nearbysearch" else mock.details(params)
+            self._send(200, json.dumps(body).encode(), "application/json")
+
+        def _send(self, code: int, body: bytes, content_type: str):
+            try:
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass   # client gave up (e.g. its read timeout fired)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class MockPlacesServer:
+    """
+    Runs a MockPlaces behind a threaded HTTP server in the background.
+    `base` is the value to use as PLACES_BASE.
+    """
+
+    def __init__(self, mock: MockPlaces, host: str = "127.0.0.1", port: int = 0):
+        self.mock    = mock
+        self.httpd   = ThreadingHTTPServer((host, port), _handler(mock))
+        self.httpd.daemon_threads = True
+        self.base    = f"http://{host}:{self.httpd.server_address[1]}/maps/api/place"
+        self._thread = None
+
+    def start(self) -> "MockPlacesServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local Google Places stand-in for load tests")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--places", type=int, default=3000, help="synthetic city size")
+    ap.add_argument("--city-radius-km", type=float, default=4.0)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="mean added latency per request")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- latency jitter")
+    ap.add_argument("--over-query-limit", type=float, default=0.0, help="OVER_QUERY_LIMIT rate")
+    ap.add_argument("--timeout-rate", type=float, default=0.0, help="rate of requests left hanging")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 rate")
+    ap.add_argument("--token-delay", type=float, default=TOKEN_DELAY,
+                    help="seconds before a next_page_token is valid")
+    args = ap.parse_args()
+
+    mock = MockPlaces(
+        generate_city(args.places, radius_km=args.city_radius_km, seed=args.seed),
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        over_query_limit=args.over_query_limit, timeout_rate=args.timeout_rate,
+        error_rate=args.error_rate, token_delay=args.token_delay, seed=args.seed,
+    )
+    server = MockPlacesServer(mock, args.host, args.port)
+    print(f"Mock Places API with {len(mock.places)} places — PLACES_BASE={server.base}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
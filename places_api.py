@@ -1,60 +1,134 @@
 # places_api.py — All Google Places API interactions
-# Search anchor: Plaça de Catalunya (41.3870, 2.1700)
+# Default search anchor: Plaça de Catalunya (41.3870, 2.1700); any user location
+# is snapped to a shared tile so nearby users reuse the same fetched data.
+# The fetch functions are asyncio-native (a-prefixed) and run on the shared loop
+# from http_client; the sync names are thin wrappers over them.
 
-import requests
-import streamlit as st
+import asyncio
+import contextvars
+import os
+import threading
+import time
 
-PLACES_BASE  = "https://maps.googleapis.com/maps/api/place"
-GEOCODE_BASE = "https://maps.googleapis.com/maps/api/geocode"
+import metrics
+import quota
+from http_client import aget_json, get_loop, run_sync, ENDPOINT_TIMEOUTS
+from restaurant import Restaurant
+from restaurant_store import STORE_TTL, get_store
 
-# Plaça de Catalunya — single source of truth for all location references
+# Overridable so load tests can point at a local stand-in (see mock_places.py)
+PLACES_BASE  = os.environ.get("PLACES_BASE", "https://maps.googleapis.com/maps/api/place").rstrip("/")
+GEOCODE_BASE = os.environ.get("GEOCODE_BASE", "https://maps.googleapis.com/maps/api/geocode").rstrip("/")
+
+# Plaça de Catalunya — default user location when none is provided
 CENTER_LAT = 41.3870
 CENTER_LNG = 2.1700
 
+# Search tiles — nearby searches run at the tile centre, cached per tile
+TILE_KM         = 1.0
+KM_PER_DEG_LAT  = 111.32
+WALK_KM_PER_MIN = 0.08
+
 DETAIL_FIELDS = (
     "name,rating,user_ratings_total,price_level,"
     "vicinity,geometry,opening_hours,photos,types,"
     "formatted_address,url"
 )
 
+# Two-tier enrichment: the catalogue is built from Nearby Search results alone,
+# and only picks about to be shown get Place Details, for the fields Nearby
+# Search lacks (closing time, maps link)
+LAZY_DETAIL_FIELDS = "opening_hours,url"
+DETAIL_LOOKAHEAD   = 6   # ranks after the top 3 whose details are prefetched for the next refresh
+
+# Enrichment stage — concurrent Place Details calls are bounded by a semaphore
+ENRICH_WORKERS = 8    # max concurrent Place Details requests per load
+DETAIL_TIMEOUT = ENDPOINT_TIMEOUTS["details"]   # seconds, per Place Details request
+
+
+# Google needs a moment before a next_page_token becomes valid
+NEXT_PAGE_DELAY = float(os.environ.get("PLACES_NEXT_PAGE_DELAY", 2.0))
+
+# Open / closed labels are a snapshot of when they were fetched (open_now);
+# older than this, records are served without one (see opening_label)
+OPENING_STATUS_TTL = STORE_TTL
+UNKNOWN_HOURS      = ("unknown", "Hours unavailable")
+
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_nearby_restaurants(api_key: str, radius: int = 1500, min_rating: float = 4.0) -> list:
+class IncompleteResults(RuntimeError):
     """
-    FIX #4: radius is now a parameter so the UI slider actually affects results.
-    Calls Places Nearby Search around Plaça de Catalunya.
-    Returns up to 60 results (3 pages x 20), filtered by min_rating.
+    A Nearby Search failed after some pages had arrived; `status` is the failing
+    page's. `throttled` when that was backpressure (our quota shed or queued the
+    call out, or Google answered OVER_QUERY_LIMIT): worth retrying later, and
+    whatever is already cached should keep serving meanwhile.
+    """
+
+    def __init__(self, status: str, pages: int):
+        super().__init__(f"nearby search stopped after {pages} page(s): {status}")
+        self.status    = status
+        self.pages     = pages
+        self.throttled = status in quota.THROTTLED_STATUSES
+
+
+async def aiter_nearby_pages(api_key: str, radius: int = 1500, min_rating: float = 4.0,
+                             lat: float = CENTER_LAT, lng: float = CENTER_LNG):
+    """
+    Yields each Nearby Search page (filtered by min_rating) as soon as it arrives,
+    up to 3 pages x 20. The next_page_token wait happens between yields, so a
+    consumer can work on page N while page N+1 is pending. A failed first page
+    yields nothing; a failed later page raises IncompleteResults, so a partial
+    result is never mistaken for a complete one.
     """
-    results = []
     url     = f"{PLACES_BASE}/nearbysearch/json"
     params  = {
-        "location": f"{CENTER_LAT},{CENTER_LNG}",
+        "location": f"{lat},{lng}",
         "radius":   radius,
         "type":     "restaurant",
         "key":      api_key,
     }
-    for _page in range(3):
-        resp = requests.get(url, params=params, timeout=10)
-        data = resp.json()
+    for page in range(3):
+        with metrics.timer("nearby_search", page=page + 1):
+            data = await aget_json(url, params, endpoint="nearbysearch")
         if data.get("status") not in ("OK", "ZERO_RESULTS"):
-            break
-        for place in data.get("results", []):
-            if place.get("rating", 0) >= min_rating:
-                results.append(place)
+            if page:
+                raise IncompleteResults(data.get("status", "UNKNOWN_ERROR"), page)
+            return
+        yield [p for p in data.get("results", []) if p.get("rating", 0) >= min_rating]
         next_token = data.get("next_page_token")
         if not next_token:
-            break
-        import time; time.sleep(2)
+            return
+        await asyncio.sleep(NEXT_PAGE_DELAY)
         params = {"pagetoken": next_token, "key": api_key}
-    return results
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_place_details(place_id: str, api_key: str) -> dict:
-    url    = f"{PLACES_BASE}/details/json"
-    params = {"place_id": place_id, "fields": DETAIL_FIELDS, "key": api_key}
-    resp   = requests.get(url, params=params, timeout=10)
-    return resp.json().get("result", {})
+def iter_nearby_pages(api_key: str, radius: int = 1500, min_rating: float = 4.0,
+                      lat: float = CENTER_LAT, lng: float = CENTER_LNG):
+    """Sync aiter_nearby_pages: blocks for each page in turn."""
+    pages = aiter_nearby_pages(api_key, radius=radius, min_rating=min_rating, lat=lat, lng=lng)
+    try:
+        while True:
+            try:
+                yield run_sync(pages.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(pages.aclose())
+
+
+async def afetch_place_details(place_id: str, api_key: str, timeout: float = DETAIL_TIMEOUT,
+                               fields: str = DETAIL_FIELDS):
+    """
+    Place Details (just `fields`) as a shared read-only mapping from the
+    restaurant store, stamped with the time it was fetched (`fetched_at`).
+    """
+    async def _load():
+        url    = f"{PLACES_BASE}/details/json"
+        params = {"place_id": place_id, "fields": fields, "key": api_key}
+        with metrics.timer("place_details"):
+            data = await aget_json(url, params, endpoint="details", timeout=timeout)
+        result = data.get("result")
+        return {**result, "fetched_at": time.time()} if result else {}
+    return await get_store().aget_or_load(("details", place_id, fields), _load)
 
 
 def build_photo_url(photo_reference: str, api_key: str, max_width: int = 800) -> str:
@@ -71,7 +145,7 @@ def get_opening_status(details: dict) -> tuple[str, str]:
     open_now = oh.get("open_now")
     periods  = oh.get("periods", [])
     if open_now is None:
-        return "unknown", "Hours unavailable"
+        return UNKNOWN_HOURS
     if not open_now:
         return "closed", "Closed now"
     from datetime import datetime
@@ -90,6 +164,17 @@ def get_opening_status(details: dict) -> tuple[str, str]:
     return "open", "Open now"
 
 
+def opening_label(r) -> tuple[str, str]:
+    """
+    (status key, label) to show for `r` now: the stored open / closed label
+    while it is younger than OPENING_STATUS_TTL, else UNKNOWN_HOURS, so a
+    record served stale from the store never claims "Open now" from yesterday.
+    """
+    if time.time() - r.get("status_at", 0.0) > OPENING_STATUS_TTL:
+        return UNKNOWN_HOURS
+    return r["opening_status"], r["opening_hours"]
+
+
 def classify_cuisine(types: list, name: str) -> str:
     cuisine_map = {
         "japanese_restaurant":      "Japanese",
@@ -142,18 +227,23 @@ def haversine_km(lat1, lng1, lat2, lng2) -> float:
     return round(R * 2 * math.asin(math.sqrt(a)), 2)
 
 
-def enrich_restaurant(place: dict, api_key: str) -> dict | None:
+def walk_minutes_for(distance_km: float) -> int:
+    return max(1, round(distance_km / WALK_KM_PER_MIN))
+
+
+def _build_restaurant(place: dict, details, api_key: str,
+                      origin_lat: float, origin_lng: float) -> Restaurant | None:
+    # Details fields win over the Nearby Search ones; `details` may be empty
     place_id = place.get("place_id")
     if not place_id:
         return None
-    details  = fetch_place_details(place_id, api_key)
     name     = details.get("name") or place.get("name", "Unknown")
     types    = details.get("types") or place.get("types", [])
     vicinity = details.get("vicinity") or place.get("vicinity", "")
     geometry = details.get("geometry") or place.get("geometry", {})
     location = geometry.get("location", {})
-    lat      = location.get("lat", CENTER_LAT)
-    lng      = location.get("lng", CENTER_LNG)
+    lat      = location.get("lat", origin_lat)
+    lng      = location.get("lng", origin_lng)
     photos   = details.get("photos") or place.get("photos", [])
     if not photos:
         return None
@@ -161,39 +251,346 @@ def enrich_restaurant(place: dict, api_key: str) -> dict | None:
     photo_url = build_photo_url(photo_ref, api_key) if photo_ref else None
     if not photo_url:
         return None
-    distance_km  = haversine_km(CENTER_LAT, CENTER_LNG, lat, lng)
-    walk_minutes = max(1, round(distance_km / 0.08))
-    status_key, status_text = get_opening_status(details)
+    distance_km  = haversine_km(origin_lat, origin_lng, lat, lng)
+    walk_minutes = walk_minutes_for(distance_km)
+    status_key, status_text = get_opening_status(details if "opening_hours" in details else place)
+    status_at     = details.get("fetched_at") or time.time()   # the search payload was just fetched
     rating        = details.get("rating") or place.get("rating", 0)
     reviews_count = details.get("user_ratings_total") or place.get("user_ratings_total", 0)
     price_level   = details.get("price_level") or place.get("price_level", 2)
-    return {
-        "name":           name,
-        "place_id":       place_id,
-        "cuisine":        classify_cuisine(types, name),
-        "neighborhood":   get_neighborhood(vicinity),
-        "rating":         rating,
-        "reviews_count":  reviews_count,
-        "price_level":    price_level if price_level else 2,
-        "distance_km":    distance_km,
-        "walk_minutes":   walk_minutes,
-        "types":          types,
-        "opening_status": status_key,
-        "opening_hours":  status_text,
-        "photo_url":      photo_url,
-        "maps_url":       details.get("url", ""),
-        "lat":            lat,
-        "lng":            lng,
-    }
+    return Restaurant.create(
+        name           = name,
+        place_id       = place_id,
+        cuisine        = classify_cuisine(types, name),
+        neighborhood   = get_neighborhood(vicinity),
+        rating         = rating,
+        reviews_count  = reviews_count,
+        price_level    = price_level if price_level else 2,
+        distance_km    = distance_km,
+        walk_minutes   = walk_minutes,
+        types          = types,
+        opening_status = status_key,
+        opening_hours  = status_text,
+        photo_url      = photo_url,
+        maps_url       = details.get("url", ""),
+        lat            = lat,
+        lng            = lng,
+        detailed       = bool(details),
+        status_at      = status_at,
+    )
+
+
+def light_restaurant(place: dict, api_key: str, origin_lat: float = CENTER_LAT,
+                     origin_lng: float = CENTER_LNG) -> Restaurant | None:
+    """Record built from the Nearby Search payload alone — no Place Details call."""
+    return _build_restaurant(place, {}, api_key, origin_lat, origin_lng)
+
+
+async def adetail_restaurant(r: Restaurant, api_key: str, timeout: float = DETAIL_TIMEOUT) -> Restaurant:
+    """Second tier: fills in closing time and maps link for a light record."""
+    if r.detailed or not api_key:
+        return r
+    with metrics.timer("enrich"):
+        details = await afetch_place_details(r.place_id, api_key, timeout=timeout, fields=LAZY_DETAIL_FIELDS)
+    if not details:
+        return r
+    if "opening_hours" in details:
+        status_key, status_text = get_opening_status(details)
+        r = r.replace(opening_status=status_key, opening_hours=status_text, status_at=details["fetched_at"])
+    return r.replace(maps_url=details.get("url") or r.maps_url, detailed=True)
+
+
+async def awith_details(records: list, api_key: str, max_workers: int = ENRICH_WORKERS,
+                        timeout: float = DETAIL_TIMEOUT) -> list:
+    """
+    `records` (Restaurants or ScoredRestaurants) with their second-tier details,
+    at most `max_workers` fetches in flight. Order is kept; a failed fetch keeps
+    the light record.
+    """
+    from restaurant import ScoredRestaurant
+    slots = asyncio.Semaphore(max_workers)
+
+    async def _one(rec):
+        base = rec.restaurant if isinstance(rec, ScoredRestaurant) else rec
+        try:
+            async with slots:
+                full = await adetail_restaurant(base, api_key, timeout=timeout)
+        except Exception:
+            return rec
+        if full is base:
+            return rec
+        if isinstance(rec, ScoredRestaurant):
+            return ScoredRestaurant(full, rec.score, rec.score_detail, rec.explanation)
+        return full
+
+    pending = [r for r in records if not (r.restaurant if isinstance(r, ScoredRestaurant) else r).detailed]
+    if not pending or not api_key:
+        return list(records)
+    return list(await asyncio.gather(*(_one(r) for r in records)))
+
+
+def with_details(records: list, api_key: str, max_workers: int = ENRICH_WORKERS,
+                 timeout: float = DETAIL_TIMEOUT) -> list:
+    return run_sync(awith_details(records, api_key, max_workers, timeout))
+
+
+def prefetch_details(records: list, api_key: str):
+    """
+    Warms the details store for `records` in the background (lookahead picks),
+    in the background quota lane; skipped while the details quota is under pressure.
+    """
+    if not records or not api_key or quota.shed("details"):
+        return
+
+    async def _prefetch():
+        with quota.lane(quota.BACKGROUND):
+            await awith_details(list(records), api_key)
+
+    asyncio.run_coroutine_threadsafe(_prefetch(), get_loop())
+
+
+def is_listable(r: Restaurant | None) -> bool:
+    return bool(r) and r["rating"] >= 4.0 and r["reviews_count"] >= 50
+
+
+def stream_restaurants(api_key: str, radius: int = 1500,
+                       lat: float = CENTER_LAT, lng: float = CENTER_LNG):
+    """
+    Pipelined fetch → build: a background thread walks the Nearby Search pages
+    while the caller works on whatever page has already landed. Yields one list
+    of light (Nearby Search only, see with_details) listable restaurants per
+    page, in page order. Whatever stopped the fetch (network error,
+    IncompleteResults) is raised here, after the pages that did arrive.
+    """
+    import queue
+    pages = queue.Queue()
+
+    def _fetch_pages():
+        try:
+            for page in iter_nearby_pages(api_key, radius=radius, lat=lat, lng=lng):
+                pages.put(page)
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(None)
+
+    # The fetching thread keeps the caller's context (its quota lane)
+    threading.Thread(target=contextvars.copy_context().run, args=(_fetch_pages,), daemon=True).start()
+    while (page := pages.get()) is not None:
+        if isinstance(page, Exception):
+            raise page
+        batch = [light_restaurant(p, api_key, origin_lat=lat, origin_lng=lng) for p in page]
+        yield [r for r in batch if is_listable(r)]
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_all_restaurants(api_key: str, radius: int = 1500) -> list:
-    """FIX #4: radius passed through so the UI slider actually affects search area."""
-    raw      = fetch_nearby_restaurants(api_key, radius=radius)
-    enriched = []
-    for place in raw:
-        r = enrich_restaurant(place, api_key)
-        if r and r["rating"] >= 4.0 and r["reviews_count"] >= 50:
-            enriched.append(r)
-    return enriched
\ No newline at end of file
+async def aload_all_restaurants(api_key: str, radius: int = 1500,
+                                lat: float = CENTER_LAT, lng: float = CENTER_LNG) -> tuple:
+    """
+    FIX #4: radius passed through so the UI slider actually affects search area.
+    Distances and walk times are measured from (lat, lng). The catalogue is
+    kept once per process in the restaurant store and shared read-only by
+    every session; it is keyed on the search, not on the API key.
+    """
+    async def _load():
+        catalogue = []
+        async for page in aiter_nearby_pages(api_key, radius=radius, lat=lat, lng=lng):
+            batch = [light_restaurant(p, api_key, origin_lat=lat, origin_lng=lng) for p in page]
+            catalogue.extend(r for r in batch if is_listable(r))
+        return catalogue
+    return await get_store().aget_or_load(("catalogue", lat, lng, radius), _load)
+
+
+def load_all_restaurants(api_key: str, radius: int = 1500,
+                         lat: float = CENTER_LAT, lng: float = CENTER_LNG) -> tuple:
+    return run_sync(aload_all_restaurants(api_key, radius, lat, lng))
+
+
+def tile_anchor(lat: float, lng: float) -> tuple:
+    """Centre of the TILE_KM tile containing (lat, lng); all users in a tile share it."""
+    import math
+    lat_step = TILE_KM / KM_PER_DEG_LAT
+    tile_lat = (math.floor(lat / lat_step) + 0.5) * lat_step
+    lng_step = TILE_KM / (KM_PER_DEG_LAT * math.cos(math.radians(tile_lat)))
+    tile_lng = (math.floor(lng / lng_step) + 0.5) * lng_step
+    return round(tile_lat, 6), round(tile_lng, 6)
+
+
+def tile_fetch_radius(radius: int) -> int:
+    # Widen by the tile half-diagonal so any user in the tile is fully covered,
+    # then round up to 500 m so neighbouring radii share one cached fetch
+    half_diag_m = TILE_KM * 1000 * 0.7072
+    return int(-(-(radius + half_diag_m) // 500) * 500)
+
+
+def localize(restaurants: list, lat: float, lng: float) -> list:
+    """`restaurants` with distance and walk time measured from (lat, lng)."""
+    out = []
+    for r in restaurants:
+        d = haversine_km(lat, lng, r["lat"], r["lng"])
+        if d == r["distance_km"]:
+            out.append(r)   # searched from this very point — share the record
+        else:
+            out.append(r.replace(distance_km=d, walk_minutes=walk_minutes_for(d)))
+    return out
+
+
+# Spatial index per tile over the widest radius fetched for that tile
+# Tile indexes are restaurant store entries, key ("index", tile): the same TTL,
+# stale window, LRU order and memory budget as the catalogues they index
+SPATIAL_INDEX_TTL = STORE_TTL
+
+
+def _covering_index(tile: tuple, lat: float, lng: float, radius_km: float) -> tuple:
+    # (index, "fresh" | "stale") when the tile's index covers the circle, else (None, "miss")
+    index, state = get_store().peek(("index", tile))
+    if index is None or not index.covers(lat, lng, radius_km):
+        return None, "miss"
+    return index, state
+
+
+def _install_index(tile: tuple, catalogue: list, fetch_radius: int):
+    """
+    Indexes `catalogue` and returns the tile's index. A fresh index already
+    installed is only replaced by one at least as wide, so a narrower load
+    finishing last never shrinks the tile's coverage.
+    """
+    from spatial_index import GridIndex
+    index = GridIndex(catalogue, tile[0], tile[1], fetch_radius / 1000)
+    return get_store().put(("index", tile), index,
+                           replace=lambda installed: index.radius_km >= installed.radius_km)
+
+
+def install_catalogue(lat: float, lng: float, radius: int, catalogue: list) -> tuple:
+    """
+    Registers a catalogue built elsewhere (snapshot import, delta refresh) as the
+    stored search for tile centre (lat, lng) / radius and indexes it.
+    """
+    catalogue = get_store().put(("catalogue", lat, lng, radius), list(catalogue))
+    _install_index((lat, lng), catalogue, radius)
+    return catalogue
+
+
+def indexed_restaurants_within(radius: int = 1500, lat: float = CENTER_LAT,
+                               lng: float = CENTER_LNG) -> list | None:
+    """
+    Restaurants within `radius` metres of (lat, lng), with distances measured
+    from there, from an installed, fresh tile index only; None when no index
+    covers the area yet. Never calls the API.
+    """
+    radius_km    = radius / 1000
+    index, state = _covering_index(tile_anchor(lat, lng), lat, lng, radius_km)
+    if state != "fresh":
+        return None
+    return localize(index.query_radius(lat, lng, radius_km), lat, lng)
+
+
+class _TileLoad:
+    """
+    One in-flight progressive load of a tile. Every session that needs the
+    tile meanwhile follows it instead of starting its own searches. `error`
+    is whatever cut the load short; followers get it after the last snapshot.
+    """
+
+    def __init__(self, fetch_radius: int):
+        self.fetch_radius = fetch_radius
+        self.snapshots    = []
+        self.done         = False
+        self.error        = None
+        self._cond        = threading.Condition()
+
+    def publish(self, catalogue: list):
+        with self._cond:
+            self.snapshots.append(catalogue)
+            self._cond.notify_all()
+
+    def finish(self, error: Exception = None):
+        with self._cond:
+            self.done  = True
+            self.error = error
+            self._cond.notify_all()
+
+    def follow(self):
+        """
+        Yields the newest snapshot each time one lands (late joiners skip ahead);
+        raises the load's error once the snapshots that did land are consumed.
+        """
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self.snapshots) and not self.done:
+                    self._cond.wait()
+                if seen == len(self.snapshots):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                seen = len(self.snapshots)
+                catalogue = self.snapshots[-1]
+            yield catalogue
+
+
+_tile_loads      = {}   # tile -> _TileLoad in flight
+_tile_loads_lock = threading.Lock()
+
+
+def _start_tile_load(api_key: str, tile: tuple, fetch_radius: int, lane: str = quota.USER) -> _TileLoad:
+    """
+    Single-flight: joins a running load of `tile` that is at least as wide, else
+    starts one. Refreshes of a still-served index run in the background quota lane.
+    """
+    with _tile_loads_lock:
+        load = _tile_loads.get(tile)
+        if load is not None and load.fetch_radius >= fetch_radius:
+            metrics.incr("store_coalesced", kind="tile")
+            return load
+        load = _tile_loads[tile] = _TileLoad(fetch_radius)
+
+    def _load():
+        catalogue, error = [], None
+        try:
+            with quota.lane(lane):
+                for batch in stream_restaurants(api_key, radius=fetch_radius, lat=tile[0], lng=tile[1]):
+                    catalogue.extend(batch)
+                    load.publish(list(catalogue))
+            # Only a clean, non-empty run is installed. A partial one (a later page
+            # refused or lost) reaches the followers but is never cached, and an
+            # empty one (first page refused, outage) neither: a stale index keeps serving
+            if catalogue:
+                install_catalogue(tile[0], tile[1], fetch_radius, catalogue)
+        except Exception as e:
+            error = e
+            throttled = getattr(e, "throttled", False)
+            metrics.incr("tile_loads", result="throttled" if throttled else "incomplete", lane=lane)
+        finally:
+            with _tile_loads_lock:
+                if _tile_loads.get(tile) is load:
+                    del _tile_loads[tile]
+            load.finish(error)
+
+    threading.Thread(target=_load, daemon=True).start()
+    return load
+
+
+def load_restaurants_progressive(api_key: str, radius: int = 1500,
+                                 lat: float = CENTER_LAT, lng: float = CENTER_LNG):
+    """
+    Yields the growing list of restaurants within `radius` metres of (lat, lng)
+    after each Nearby Search page has been enriched, so callers can score and
+    show picks before the last page arrives. The load keeps running in the
+    background if the caller stops early, and installs the tile index when done
+    so the next request is served from memory. Concurrent sessions share one
+    load per tile; an expired index is served as is while that load refreshes
+    it. A load cut short raises its error (e.g. IncompleteResults) after the
+    last partial list, which is then not cached anywhere.
+    """
+    radius_km    = radius / 1000
+    tile         = tile_anchor(lat, lng)
+    index, state = _covering_index(tile, lat, lng, radius_km)
+    if index is not None:
+        if state == "stale" and not quota.shed("nearbysearch"):   # stale-while-revalidate
+            _start_tile_load(api_key, tile, round(index.radius_km * 1000), quota.BACKGROUND)
+        yield localize(index.query_radius(lat, lng, radius_km), lat, lng)
+        return
+
+    for catalogue in _start_tile_load(api_key, tile, tile_fetch_radius(radius)).follow():
+        nearby = [r for r in catalogue if haversine_km(lat, lng, r["lat"], r["lng"]) <= radius_km]
+        yield localize(nearby, lat, lng)
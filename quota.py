@@ -0,0 +1,253 @@
+# quota.py — Token buckets and daily budgets for Places and LLM calls
+# One bucket per endpoint the server calls (nearbysearch, details, chat), shared
+# by the whole process; photos are loaded by the browser from build_photo_url()
+# and never pass through here. Two priority lanes: "user" (someone is waiting on
+# the result) and "background" (prefetch, stale refresh). Background calls queue
+# behind waiting user calls, leave a reserve of tokens untouched and are shed
+# outright under backpressure (cooldown after OVER_QUERY_LIMIT, or most of the
+# daily budget spent).
+#
+#   FORYOU_QUOTAS="details=20/40/10000,chat=5/3/20000"   # rate/burst/daily per endpoint
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+USER       = "user"
+BACKGROUND = "background"
+
+# endpoint -> (requests per second, burst, requests per UTC day)
+DEFAULT_QUOTAS = {
+    "nearbysearch": (10.0, 10, 5_000),
+    "details":      (20.0, 20, 20_000),
+    "chat":         (5.0,  3,  20_000),
+}
+MAX_WAIT           = 10.0   # seconds a call may queue for a token before giving up
+BACKGROUND_RESERVE = 0.25   # share of the burst background calls may not dip into
+BACKGROUND_BUDGET  = 0.8    # background calls stop once this share of the day is spent
+COOLDOWN_BASE      = 2.0    # seconds after the first OVER_QUERY_LIMIT, doubled per repeat
+COOLDOWN_CAP       = 60.0   # seconds, longest single cooldown
+
+# API statuses that mean "throttled" (Google's, or ours for a refused call)
+THROTTLED_STATUSES = ("OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT")
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised instead of sending a call; `status` is the matching Google API status."""
+
+    def __init__(self, endpoint: str, status: str, reason: str):
+        super().__init__(f"{endpoint}: {reason}")
+        self.endpoint = endpoint
+        self.status   = status
+        self.reason   = reason
+
+
+def _utc_day() -> int:
+    return int(time.time() // 86400)
+
+
+class TokenBucket:
+    """Rate + burst limiter with a daily budget and an OVER_QUERY_LIMIT cooldown."""
+
+    def __init__(self, endpoint: str, rate: float, burst: int, daily: int):
+        self.endpoint       = endpoint
+        self.rate           = rate
+        self.burst          = burst
+        self.daily          = daily
+        self.tokens         = float(burst)
+        self.updated        = time.monotonic()
+        self.day            = _utc_day()
+        self.used           = 0
+        self.strikes        = 0
+        self.cooldown_until = 0.0
+        self.user_waiting   = 0
+        self._lock          = threading.Lock()
+
+    def _refill(self, now: float):
+        # caller holds the lock
+        self.tokens  = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if _utc_day() != self.day:
+            self.day, self.used = _utc_day(), 0
+
+    def _take(self, lane: str) -> float:
+        """Takes a token (returns 0.0) or returns how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            if self.used >= self.daily:
+                raise QuotaExceeded(self.endpoint, "OVER_DAILY_LIMIT", "daily budget spent")
+            if now < self.cooldown_until:
+                return self.cooldown_until - now
+            floor = 1.0
+            if lane == BACKGROUND:
+                if self.user_waiting:
+                    return 1.0 / self.rate
+                floor += self.burst * BACKGROUND_RESERVE
+            if self.tokens >= floor:
+                self.tokens -= 1
+                self.used   += 1
+                return 0.0
+            return (floor - self.tokens) / self.rate
+
+    def waits(self, lane: str, timeout: float):
+        """Yields sleep durations until a token is taken; raises QuotaExceeded on shed/timeout."""
+        if lane == BACKGROUND and self.shedding():
+            raise QuotaExceeded(self.endpoint, "OVER_QUERY_LIMIT", "background call shed")
+        deadline = time.monotonic() + timeout
+        waiting  = False
+        try:
+            while True:
+                wait = self._take(lane)
+                if not wait:
+                    return
+                if time.monotonic() + wait > deadline:
+                    raise QuotaExceeded(self.endpoint, "OVER_QUERY_LIMIT", f"no token within {timeout:g}s")
+                if lane == USER and not waiting:
+                    waiting = True
+                    with self._lock:
+                        self.user_waiting += 1
+                yield wait
+        finally:
+            if waiting:
+                with self._lock:
+                    self.user_waiting -= 1
+
+    def record(self, status: str):
+        """Feeds back the API status of a call: OVER_QUERY_LIMIT starts (or extends) a cooldown."""
+        with self._lock:
+            if status == "OVER_QUERY_LIMIT":
+                cooldown            = min(COOLDOWN_CAP, COOLDOWN_BASE * 2 ** self.strikes)
+                self.strikes       += 1
+                self.tokens         = 0.0
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+            elif status in ("OK", "ZERO_RESULTS"):
+                self.strikes = 0
+
+    def throttled(self) -> bool:
+        """Cooling down after OVER_QUERY_LIMIT, or out of budget for today."""
+        with self._lock:
+            return time.monotonic() < self.cooldown_until or self.used >= self.daily
+
+    def shedding(self) -> bool:
+        """Backpressure: background work should not be started."""
+        return self.throttled() or self.used >= self.daily * BACKGROUND_BUDGET
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            return {
+                "tokens":       round(self.tokens, 2),
+                "used_today":   self.used,
+                "daily_budget": self.daily,
+                "cooldown_s":   round(max(0.0, self.cooldown_until - now), 1),
+                "user_waiting": self.user_waiting,
+            }
+
+
+def _parse_overrides(spec: str) -> dict:
+    quotas = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        try:
+            endpoint, values = item.split("=", 1)
+            rate, burst, daily = values.split("/")
+            rate, burst, daily = float(rate), int(burst), int(daily)
+            if not (rate > 0 and burst >= 1 and daily >= 0):   # also rejects nan
+                raise ValueError(item)
+            quotas[endpoint.strip()] = (rate, burst, daily)
+        except ValueError:
+            continue   # a malformed entry keeps that endpoint's default
+    return quotas
+
+
+QUOTAS = {**DEFAULT_QUOTAS, **_parse_overrides(os.environ.get("FORYOU_QUOTAS", ""))}
+
+_buckets      = {}
+_buckets_lock = threading.Lock()
+_lane         = contextvars.ContextVar("quota_lane", default=USER)
+
+
+def get_bucket(endpoint: str) -> TokenBucket | None:
+    """The process-wide bucket for `endpoint`; None for endpoints without a quota."""
+    bucket = _buckets.get(endpoint)
+    if bucket is None and endpoint in QUOTAS:
+        with _buckets_lock:
+            bucket = _buckets.get(endpoint)
+            if bucket is None:
+                bucket = _buckets[endpoint] = TokenBucket(endpoint, *QUOTAS[endpoint])
+    return bucket
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+@contextmanager
+def lane(name: str):
+    """with lane(BACKGROUND): ... — every quota acquire inside runs in that lane."""
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def _wait_steps(endpoint: str, lane_name: str, timeout: float):
+    bucket = get_bucket(endpoint)
+    if bucket is None:
+        return iter(())
+    lane_name = lane_name or _lane.get()
+    return _metered(bucket, lane_name, timeout)
+
+
+def _metered(bucket: TokenBucket, lane_name: str, timeout: float):
+    waited = 0.0
+    try:
+        for wait in bucket.waits(lane_name, timeout):
+            waited += wait
+            yield wait
+    except QuotaExceeded as e:
+        metrics.incr("quota_rejected", endpoint=bucket.endpoint, lane=lane_name, status=e.status)
+        raise
+    if waited:
+        metrics.observe("quota_wait", waited, endpoint=bucket.endpoint, lane=lane_name)
+
+
+def acquire(endpoint: str, lane_name: str = None, timeout: float = MAX_WAIT):
+    """Blocks until `endpoint` may be called; raises QuotaExceeded if it may not."""
+    for wait in _wait_steps(endpoint, lane_name, timeout):
+        time.sleep(wait)
+
+
+async def aacquire(endpoint: str, lane_name: str = None, timeout: float = MAX_WAIT):
+    """acquire() for coroutines: waits without blocking the event loop."""
+    import asyncio
+    for wait in _wait_steps(endpoint, lane_name, timeout):
+        await asyncio.sleep(wait)
+
+
+def record(endpoint: str, status: str):
+    bucket = get_bucket(endpoint)
+    if bucket is not None:
+        bucket.record(status)
+
+
+def throttled(endpoint: str) -> bool:
+    bucket = get_bucket(endpoint)
+    return bucket is not None and bucket.throttled()
+
+
+def shed(endpoint: str) -> bool:
+    """True when background work against `endpoint` should be skipped (backpressure)."""
+    bucket = get_bucket(endpoint)
+    return bucket is not None and bucket.shedding()
+
+
+def status() -> dict:
+    """endpoint -> tokens / used_today / daily_budget / cooldown_s / user_waiting."""
+    return {endpoint: get_bucket(endpoint).status() for endpoint in QUOTAS}
@@ -0,0 +1,111 @@
+# restaurant.py — Compact records for enriched places and their scores
+# Restaurant replaces the 16-key dict from enrich_restaurant: slotted, immutable,
+# with interned type / label strings shared across the whole catalogue. Both
+# classes keep the read side of the dict interface (r["name"], r.get(...)), so
+# scoring, explanations and r_to_js work on them unchanged.
+
+import sys
+from dataclasses import dataclass, fields, replace
+
+
+class _MappingView:
+    """Dict-style read access over slots: r[key], r.get(key), key in r, keys()."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+
+@dataclass(frozen=True, slots=True)
+class Restaurant(_MappingView):
+    name:           str
+    place_id:       str
+    cuisine:        str
+    neighborhood:   str
+    rating:         float
+    reviews_count:  int
+    price_level:    int
+    distance_km:    float
+    walk_minutes:   int
+    types:          tuple
+    opening_status: str
+    opening_hours:  str
+    photo_url:      str
+    maps_url:       str
+    lat:            float
+    lng:            float
+    detailed:       bool = False   # opening hours / maps url come from Place Details
+    status_at:      float = 0.0    # when the opening status was observed (epoch s); 0 = unknown
+
+    @classmethod
+    def create(cls, **kw) -> "Restaurant":
+        """Builds a record with its repeated strings interned."""
+        kw["types"] = tuple(sys.intern(t) for t in kw.get("types", ()))
+        for key in ("cuisine", "neighborhood", "opening_status", "opening_hours"):
+            kw[key] = sys.intern(kw[key])
+        return cls(**kw)
+
+    @classmethod
+    def from_dict(cls, d) -> "Restaurant":
+        return cls.create(**{f.name: d[f.name] for f in fields(cls) if f.name in d})
+
+    def keys(self):
+        return [f.name for f in fields(self)]
+
+    def replace(self, **changes) -> "Restaurant":
+        return replace(self, **changes)
+
+    def to_dict(self) -> dict:
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        d["types"] = list(self.types)
+        return d
+
+
+class ScoredRestaurant(_MappingView):
+    """
+    A scored pick: a reference to the shared record plus its score fields, instead
+    of a full dict copy per survivor. Only `explanation` may be set afterwards.
+    """
+
+    __slots__ = ("restaurant", "score", "score_detail", "explanation")
+
+    _OWN = frozenset(__slots__)
+
+    def __init__(self, restaurant, score: float, score_detail: dict, explanation: str = ""):
+        self.restaurant   = restaurant
+        self.score        = score
+        self.score_detail = score_detail
+        self.explanation  = explanation
+
+    def __getitem__(self, key: str):
+        if key in self._OWN:
+            return getattr(self, key)
+        return self.restaurant[key]
+
+    def get(self, key: str, default=None):
+        if key in self._OWN:
+            return getattr(self, key)
+        return self.restaurant.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._OWN or key in self.restaurant
+
+    def __setitem__(self, key: str, value):
+        if key != "explanation":
+            raise KeyError(f"{key} is read-only on a scored restaurant")
+        self.explanation = value
+
+    def to_dict(self) -> dict:
+        base = self.restaurant.to_dict() if hasattr(self.restaurant, "to_dict") else dict(self.restaurant)
+        base.update(score=self.score, score_detail=self.score_detail, explanation=self.explanation)
+        return base
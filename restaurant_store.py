@@ -0,0 +1,254 @@
+# restaurant_store.py — Process-wide, read-only store for fetched Places data
+# One frozen copy per entry, handed out by reference to every session (no pickling
+# or copying on hit, unlike st.cache_data), with TTL, explicit invalidation and an
+# LRU memory budget. Loads are single-flight, and expired entries are served
+# stale while one background refresh runs, so an expiry never causes a herd.
+
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from types import MappingProxyType
+
+import metrics
+import quota
+
+STORE_TTL        = 3600                # seconds, matches the old st.cache_data ttl
+STORE_STALE_TTL  = 24 * 3600           # seconds past expiry an entry may still be served
+STORE_MAX_BYTES  = 256 * 1024 * 1024   # approximate budget across all entries
+
+
+def freeze(value):
+    """
+    Deep read-only view: dicts become MappingProxyType, lists become tuples.
+    Anything else (including immutable Restaurant records) is kept as is.
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def approx_size(value) -> int:
+    """Rough deep size in bytes; good enough to enforce a budget, not exact."""
+    size = sys.getsizeof(value)
+    if hasattr(value, "__slots__") and not isinstance(value, (str, bytes, int, float, tuple)):
+        return size + sum(approx_size(getattr(value, f, None)) for f in value.__slots__)
+    if isinstance(value, MappingProxyType):
+        value = dict(value)
+        size += sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, (tuple, list)):
+        size += sum(approx_size(v) for v in value)
+    return size
+
+
+class RestaurantStore:
+    """
+    Thread-safe key → frozen value store. Values are frozen on put and returned
+    as-is on get, so every caller shares the same object and must not mutate it.
+    """
+
+    def __init__(self, ttl: float = STORE_TTL, max_bytes: int = STORE_MAX_BYTES,
+                 stale_ttl: float = STORE_STALE_TTL):
+        self.ttl        = ttl
+        self.stale_ttl  = stale_ttl
+        self.max_bytes  = max_bytes
+        self.hits       = 0
+        self.misses     = 0
+        self.stale_hits = 0
+        self.coalesced  = 0
+        self.evictions  = 0
+        self._entries   = OrderedDict()   # key -> (value, size, stored_at); LRU order
+        self._inflight  = {}              # key -> (Future, quota lane) of the load running for it
+        self._tasks     = set()           # async stale refreshes, referenced until done
+        self._bytes     = 0
+        self._lock      = threading.Lock()
+
+    def _lookup(self, key) -> tuple:
+        # (value, "fresh" | "stale" | "miss"); caller holds the lock
+        entry = self._entries.get(key)
+        kind  = key[0] if isinstance(key, tuple) else "other"
+        age   = time.time() - entry[2] if entry is not None else None
+        if entry is None or age > self.ttl + self.stale_ttl:
+            if entry is not None:
+                self._drop(key)
+            state = "miss"
+        else:
+            self._entries.move_to_end(key)
+            state = "fresh" if age <= self.ttl else "stale"
+        metrics.incr("store_lookups", kind=kind, result="hit" if state == "fresh" else state)
+        return (entry[0] if state != "miss" else None), state
+
+    def get(self, key):
+        """Fresh value for `key`, or None (expired entries count as missing here)."""
+        with self._lock:
+            value, state = self._lookup(key)
+            if state == "fresh":
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def peek(self, key) -> tuple:
+        """(value, "fresh" | "stale" | "miss") without loading; a stale value is the caller's to refresh."""
+        with self._lock:
+            value, state = self._lookup(key)
+            if state == "fresh":
+                self.hits += 1
+            elif state == "stale":
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+            return value, state
+
+    def put(self, key, value, replace=None):
+        """
+        Stores `value` frozen and returns it. With `replace`, a fresh entry
+        already under `key` is only replaced if replace(current) is true;
+        otherwise that entry is kept and returned.
+        """
+        frozen = freeze(value)
+        size   = approx_size(frozen)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (replace is not None and entry is not None
+                    and time.time() - entry[2] <= self.ttl and not replace(entry[0])):
+                return entry[0]
+            if entry is not None:
+                self._drop(key)
+            self._entries[key] = (frozen, size, time.time())
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return frozen
+
+    async def aget_or_load(self, key, loader, keep=bool):
+        """
+        Cached value for `key`, or `await loader()` stored and returned. Results
+        for which keep(result) is false (e.g. an empty list after a quota error)
+        are returned but not stored.
+        Concurrent callers for the same key share one loader() call. An expired
+        entry (within stale_ttl) is returned at once while a single refresh task
+        on the caller's loop replaces it.
+        """
+        value, state, flight, leader = self._claim(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if leader:
+                task = asyncio.get_running_loop().create_task(self._arefresh(key, loader, keep, flight))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+        # Shielded: a caller that is cancelled (or times out) stops waiting, but the
+        # shared load carries on and settles for everyone following it
+        if leader:
+            return await asyncio.shield(self._aload(key, loader, keep, flight))
+        return await asyncio.shield(asyncio.wrap_future(flight))
+
+    async def _arefresh(self, key, loader, keep, flight: Future):
+        try:
+            with quota.lane(quota.BACKGROUND):
+                await self._aload(key, loader, keep, flight)
+        except Exception:
+            pass   # keep serving the stale value; the next lookup retries
+
+    async def _aload(self, key, loader, keep, flight: Future):
+        try:
+            value = await loader()
+        except BaseException as e:
+            return self._settle(key, flight, error=e)
+        return self._settle(key, flight, value, keep)
+
+    def _claim(self, key) -> tuple:
+        # (value, state, flight, leader): the lookup plus, unless fresh, the
+        # in-flight load this caller either leads or follows. A user-lane caller
+        # about to wait never follows a background load (prefetch, stale refresh):
+        # that one may be queued behind user calls or shed, so it leads its own.
+        lane = quota.current_lane()
+        with self._lock:
+            value, state = self._lookup(key)
+            if state == "fresh":
+                self.hits += 1
+                return value, state, None, False
+            flight, flight_lane = self._inflight.get(key, (None, None))
+            leader = flight is None or (state == "miss" and lane != quota.BACKGROUND
+                                        and flight_lane == quota.BACKGROUND)
+            if leader:
+                flight = Future()
+                self._inflight[key] = (flight, quota.BACKGROUND if state == "stale" else lane)
+            if state == "stale":
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+                if not leader:
+                    self.coalesced += 1
+                    metrics.incr("store_coalesced", kind=key[0] if isinstance(key, tuple) else "other")
+        return value, state, flight, leader
+
+    def _settle(self, key, flight: Future, value=None, keep=bool, error: BaseException = None):
+        # Stores the loaded value (if kept) and releases the followers of `flight`;
+        # re-raises `error`, or whatever storing the value raised
+        try:
+            if error is not None:
+                raise error
+            result = self.put(key, value) if keep(value) else freeze(value)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._inflight.get(key, (None,))[0] is flight:
+                    del self._inflight[key]
+
+    def invalidate(self, key=None, prefix: tuple = None):
+        """Drop one key, every key starting with `prefix`, or everything."""
+        with self._lock:
+            if key is not None:
+                if key in self._entries:
+                    self._drop(key)
+                return
+            for k in list(self._entries):
+                if prefix is None or (isinstance(k, tuple) and k[:len(prefix)] == prefix):
+                    self._drop(k)
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries":    len(self._entries),
+                "bytes":      self._bytes,
+                "hits":       self.hits,
+                "misses":     self.misses,
+                "stale_hits": self.stale_hits,
+                "coalesced":  self.coalesced,
+                "hit_rate":   round(self.hits / total, 3) if total else 0.0,
+                "evictions":  self.evictions,
+            }
+
+
+_store      = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RestaurantStore:
+    """Process-wide store instance, created on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RestaurantStore()
+    return _store
@@ -0,0 +1,268 @@
+# snapshot.py — Offline snapshots of the enriched catalogue
+# Versioned columnar binary file, read back through mmap, so the app can boot
+# (or run fully offline) without a single Places call.
+#
+# Layout (little-endian):
+#   MAGIC (6 bytes) | version u16 | header length u32 | header JSON | column data
+# The header lists every column as {dtype, offset, length}; numeric columns are
+# raw arrays, string columns are a u32 offsets array plus a UTF-8 blob.
+# API keys are stripped from photo URLs on export and re-added on import.
+# Open / closed labels depend on the time they were computed, so they are not
+# stored: snapshot records load with unknown hours, which the lazy details
+# fetch (or a delta refresh) fills in.
+#
+# Usage:
+#   GOOGLE_PLACES_API_KEY=... python snapshot.py export snapshots/catalogue.snap [radius_m]
+#   python snapshot.py info snapshots/catalogue.snap
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+import quota
+from restaurant import Restaurant
+
+MAGIC          = b"FYSNAP"
+VERSION        = 1
+_PREAMBLE      = struct.Struct("<6sHI")
+SNAPSHOT_PATH  = os.environ.get(
+    "FORYOU_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots", "catalogue.snap"),
+)
+OFFLINE        = os.environ.get("FORYOU_OFFLINE", "") not in ("", "0")
+
+NUMERIC_COLUMNS = {
+    "rating":        "<f8",
+    "reviews_count": "<i8",
+    "price_level":   "<i8",
+    "distance_km":   "<f8",
+    "walk_minutes":  "<i8",
+    "lat":           "<f8",
+    "lng":           "<f8",
+}
+STRING_COLUMNS = (
+    "name", "place_id", "cuisine", "neighborhood", "types", "photo_url", "maps_url",
+)
+TYPES_SEP     = "\x1f"
+_KEY_RE   = re.compile(r"&key=[^&]*")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _string_cells(catalogue: list, column: str) -> list:
+    if column == "types":
+        return [TYPES_SEP.join(r["types"]) for r in catalogue]
+    if column == "photo_url":
+        return [_KEY_RE.sub("", r["photo_url"] or "") for r in catalogue]
+    return [r[column] or "" for r in catalogue]
+
+
+def write_snapshot(path: str, catalogue: list, lat: float, lng: float, radius: int) -> dict:
+    """Writes `catalogue` (searched at lat/lng, radius metres) to `path`; returns the header."""
+    sections, columns, offset = [], {}, 0
+
+    def _add(name: str, dtype: str, payload: bytes):
+        nonlocal offset
+        columns[name] = {"dtype": dtype, "offset": offset, "length": len(payload)}
+        padded = payload + b"\0" * (_align(len(payload)) - len(payload))
+        sections.append(padded)
+        offset += len(padded)
+
+    for column, dtype in NUMERIC_COLUMNS.items():
+        _add(column, dtype, np.asarray([r[column] for r in catalogue], dtype=dtype).tobytes())
+    for column in STRING_COLUMNS:
+        encoded = [c.encode() for c in _string_cells(catalogue, column)]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        _add(column + ".off", "<u4", offsets.tobytes())
+        _add(column, "utf8", b"".join(encoded))
+
+    header = {
+        "created": time.time(),
+        "lat":     lat,
+        "lng":     lng,
+        "radius":  radius,
+        "count":   len(catalogue),
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header).encode()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp, path)   # readers never see a half-written file
+    return header
+
+
+def read_snapshot(path: str, api_key: str = "") -> tuple:
+    """Returns (header, [Restaurant, ...]) from a snapshot file, read through mmap."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) < _PREAMBLE.size:
+            raise SnapshotError(f"{path}: truncated snapshot")
+        magic, version, header_len = _PREAMBLE.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path}: not a snapshot file")
+        if version != VERSION:
+            raise SnapshotError(f"{path}: snapshot version {version}, expected {VERSION}")
+        header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        base   = _align(_PREAMBLE.size + header_len)
+        count  = header["count"]
+        cols   = header["columns"]
+
+        def _array(name: str, n: int) -> list:
+            c = cols[name]
+            return np.frombuffer(mm, dtype=c["dtype"], count=n, offset=base + c["offset"]).tolist()
+
+        def _strings(name: str) -> list:
+            off   = _array(name + ".off", count + 1)
+            start = base + cols[name]["offset"]
+            blob  = mm[start:start + cols[name]["length"]]
+            return [blob[off[i]:off[i + 1]].decode() for i in range(count)]
+
+        data = {name: _array(name, count) for name in NUMERIC_COLUMNS}
+        data.update({name: _strings(name) for name in STRING_COLUMNS})
+
+    from places_api import UNKNOWN_HOURS   # hours are never persisted: open_now goes stale
+    key_suffix = f"&key={api_key}" if api_key else ""
+    catalogue  = []
+    for i in range(count):
+        row = {name: values[i] for name, values in data.items()}
+        row["types"] = tuple(row["types"].split(TYPES_SEP)) if row["types"] else ()
+        row["opening_status"], row["opening_hours"] = UNKNOWN_HOURS
+        if row["photo_url"]:
+            row["photo_url"] += key_suffix
+        catalogue.append(Restaurant.create(**row))
+    return header, catalogue
+
+
+def export_tile(api_key: str, path: str = SNAPSHOT_PATH, radius: int = 2000,
+                lat: float = None, lng: float = None) -> dict:
+    """Fetches the tile around (lat, lng) live and writes it as a snapshot."""
+    from places_api import CENTER_LAT, CENTER_LNG, load_all_restaurants, tile_anchor, tile_fetch_radius
+    tile         = tile_anchor(lat if lat is not None else CENTER_LAT, lng if lng is not None else CENTER_LNG)
+    fetch_radius = tile_fetch_radius(radius)
+    catalogue    = load_all_restaurants(api_key, radius=fetch_radius, lat=tile[0], lng=tile[1])
+    return write_snapshot(path, catalogue, tile[0], tile[1], fetch_radius)
+
+
+def delta_refresh(api_key: str, header: dict, catalogue: list, path: str = None) -> list:
+    """
+    Re-runs the nearby search for the snapshot's tile. Known places keep their
+    record, with rating, review count and open / closed label updated from the
+    fresh search payload; new ones are added as light records (details follow
+    lazily for the picks actually shown). The refreshed catalogue is installed
+    in the store and, if `path` is given, written back as the new snapshot.
+    """
+    from places_api import (get_opening_status, install_catalogue, is_listable, iter_nearby_pages,
+                            light_restaurant)
+    lat, lng, radius = header["lat"], header["lng"], header["radius"]
+    known  = {r["place_id"]: r for r in catalogue}
+    places = [p for page in iter_nearby_pages(api_key, radius=radius, lat=lat, lng=lng) for p in page]
+    if not places:
+        return catalogue   # quota / network trouble: keep serving the snapshot
+    new      = [p for p in places if p.get("place_id") not in known]
+    enriched = {p.get("place_id"): light_restaurant(p, api_key, origin_lat=lat, origin_lng=lng) for p in new}
+
+    refreshed = []
+    for p in places:
+        r = known.get(p.get("place_id"))
+        if r is not None:
+            r = r.replace(rating=p.get("rating", r["rating"]),
+                          reviews_count=p.get("user_ratings_total", r["reviews_count"]))
+            if "opening_hours" in p:
+                status_key, status_text = get_opening_status(p)
+                r = r.replace(opening_status=status_key, opening_hours=status_text, status_at=time.time())
+        else:
+            r = enriched.get(p.get("place_id"))
+        if is_listable(r):
+            refreshed.append(r)
+    install_catalogue(lat, lng, radius, refreshed)
+    if path:
+        write_snapshot(path, refreshed, lat, lng, radius)
+    return refreshed
+
+
+_boot_lock   = threading.Lock()
+_boot_header = None
+_refreshing  = False
+
+
+def boot_from_snapshot(api_key: str, path: str = SNAPSHOT_PATH, refresh: bool = not OFFLINE) -> bool:
+    """
+    Seeds the restaurant store and spatial index from the snapshot at `path`.
+    Cheap to call on every script run: it only re-reads the file when the
+    stored catalogue is gone (first run, TTL expiry, invalidation). With
+    `refresh`, a background delta refresh against the live API follows.
+    Returns True if snapshot data is being served.
+    """
+    global _boot_header, _refreshing
+    if not os.path.exists(path):
+        return False
+    from places_api import install_catalogue
+    from restaurant_store import get_store
+    with _boot_lock:
+        h = _boot_header
+        if h is not None and get_store().get(("catalogue", h["lat"], h["lng"], h["radius"])) is not None:
+            return True
+        try:
+            header, catalogue = read_snapshot(path, api_key)
+        except (OSError, SnapshotError, ValueError):
+            return False
+        install_catalogue(header["lat"], header["lng"], header["radius"], catalogue)
+        _boot_header = header
+        if not (refresh and api_key) or _refreshing:
+            return True
+        _refreshing = True
+
+    def _refresh():
+        global _refreshing
+        try:
+            with quota.lane(quota.BACKGROUND):
+                delta_refresh(api_key, header, catalogue, path)
+        except Exception:
+            pass   # the snapshot keeps serving; the next boot retries
+        finally:
+            _refreshing = False
+
+    threading.Thread(target=_refresh, daemon=True).start()
+    return True
+
+
+def _main(argv: list) -> int:
+    if len(argv) >= 2 and argv[0] == "info":
+        header, catalogue = read_snapshot(argv[1])
+        print(json.dumps({k: v for k, v in header.items() if k != "columns"}, indent=2))
+        print(f"{len(catalogue)} restaurants, e.g. {', '.join(r['name'] for r in catalogue[:3])}")
+        return 0
+    if len(argv) >= 2 and argv[0] == "export":
+        api_key = os.environ.get("GOOGLE_PLACES_API_KEY", "")
+        if not api_key:
+            print("GOOGLE_PLACES_API_KEY is not set", file=sys.stderr)
+            return 1
+        radius = int(argv[2]) if len(argv) > 2 else 2000
+        header = export_tile(api_key, argv[1], radius=radius)
+        print(f"wrote {header['count']} restaurants to {argv[1]}")
+        return 0
+    print("usage: snapshot.py export PATH [radius_m] | info PATH", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+# spatial_index.py — Uniform-grid index over enriched restaurants
+# Answers radius / bounding-box queries locally, so shrinking the search radius
+# never needs a new Places fetch.
+
+import math
+
+from places_api import KM_PER_DEG_LAT, haversine_km
+
+CELL_KM = 0.25   # grid cell edge; ~3 min walk, a handful of places per cell downtown
+
+
+class GridIndex:
+    """
+    Buckets restaurants into CELL_KM square cells around an anchor point.
+    `center` + `radius_km` describe the area that was actually fetched, which is
+    what covers() checks before a query may be answered from the index.
+    Slotted so the restaurant store can size it against its memory budget.
+    """
+
+    __slots__ = ("center_lat", "center_lng", "radius_km", "lat_step", "lng_step", "cells", "size")
+
+    def __init__(self, restaurants: list, center_lat: float, center_lng: float,
+                 radius_km: float, cell_km: float = CELL_KM):
+        self.center_lat = center_lat
+        self.center_lng = center_lng
+        self.radius_km  = radius_km
+        self.lat_step   = cell_km / KM_PER_DEG_LAT
+        self.lng_step   = cell_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(center_lat)), 1e-6))
+        self.cells      = {}
+        self.size       = 0
+        # Cells hold (seq, restaurant) so query results keep the catalogue order
+        for seq, r in enumerate(restaurants):
+            self.cells.setdefault(self._cell(r["lat"], r["lng"]), []).append((seq, r))
+            self.size += 1
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return math.floor(lat / self.lat_step), math.floor(lng / self.lng_step)
+
+    def covers(self, lat: float, lng: float, radius_km: float) -> bool:
+        """True if a circle around (lat, lng) lies inside the fetched area."""
+        return haversine_km(self.center_lat, self.center_lng, lat, lng) + radius_km <= self.radius_km
+
+    def query_bbox(self, south: float, west: float, north: float, east: float) -> list:
+        (r0, c0), (r1, c1) = self._cell(south, west), self._cell(north, east)
+        hits = []
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                for seq, r in self.cells.get((row, col), ()):
+                    if south <= r["lat"] <= north and west <= r["lng"] <= east:
+                        hits.append((seq, r))
+        hits.sort(key=lambda h: h[0])
+        return [r for _, r in hits]
+
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> list:
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        return [
+            r for r in self.query_bbox(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+            if haversine_km(lat, lng, r["lat"], r["lng"]) <= radius_km
+        ]
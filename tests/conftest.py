@@ -0,0 +1,45 @@
+# conftest.py — Shared fixtures: a fresh process state with Places answered offline
+# Every test gets its own restaurant store, quota buckets and tile state, and the
+# pooled session is swapped for benchmarks' MockPlaces stub, so nothing is sent.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+import places_api
+import quota
+import restaurant_store
+from benchmarks import _StubSession
+from mock_places import MockPlaces, generate_city
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Empty store (catalogues and tile indexes), quota buckets and tile loads; no real waits."""
+    monkeypatch.setattr(restaurant_store, "_store", restaurant_store.RestaurantStore())
+    monkeypatch.setattr(quota, "_buckets", {})
+    monkeypatch.setattr(quota, "COOLDOWN_BASE", 0.001)
+    monkeypatch.setattr(http_client, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(http_client, "ASYNC_BACKEND", "threads")
+    monkeypatch.setattr(places_api, "NEXT_PAGE_DELAY", 0)
+    monkeypatch.setattr(places_api, "_tile_loads", {})
+    http_client._async_clients.clear()
+
+
+@pytest.fixture
+def city():
+    """A synthetic city big enough for three full Nearby Search pages."""
+    return MockPlaces(generate_city(500, seed=3), token_delay=0)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """serve(session): routes every Places call through `session` (a _StubSession)."""
+    def _serve(session: _StubSession):
+        monkeypatch.setattr(http_client, "_session", session)
+        return session
+    return _serve
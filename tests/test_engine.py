@@ -0,0 +1,39 @@
+# test_engine.py — Explanation batches: cache hits at once, finished LLM answers together
+
+import concurrent.futures
+import time
+
+import engine
+import explain_cache
+from engine import EXPLAIN_MODEL, cached_explanations, iter_explanation_batches
+
+
+def _restaurants(n: int) -> list:
+    return [{"place_id": f"p{i}", "name": f"Place {i}", "types": ["restaurant"]} for i in range(n)]
+
+
+def test_hits_come_first_and_finished_answers_together(monkeypatch):
+    cache = explain_cache.ExplanationCache(":memory:")
+    monkeypatch.setattr(explain_cache, "_cache", cache)
+    monkeypatch.setattr(engine, "_llm_explanation", lambda r, p, k: "llm " + r["name"])
+    # Both misses finish before the stream looks at them: they come as one batch
+    wait = concurrent.futures.wait
+    monkeypatch.setattr(concurrent.futures, "wait", lambda *a, **kw: time.sleep(0.2) or wait(*a, **kw))
+    profile, picks = engine.synthesize_profile(engine.USER_PROFILE), _restaurants(3)
+    cache.put(explain_cache.explanation_key(picks[1], profile, EXPLAIN_MODEL), "cached")
+
+    assert cached_explanations(picks, profile, "key") == [None, "cached", None]
+    assert list(iter_explanation_batches(picks, profile, "key")) == [
+        [(1, "cached")],
+        [(0, "llm Place 0"), (2, "llm Place 2")],
+    ]
+    assert cached_explanations(picks, profile, "key") == ["llm Place 0", "cached", "llm Place 2"]
+
+
+def test_misses_only_skips_the_cache(monkeypatch):
+    cache = explain_cache.ExplanationCache(":memory:")
+    monkeypatch.setattr(explain_cache, "_cache", cache)
+    monkeypatch.setattr(engine, "_llm_explanation", lambda r, p, k: "fresh")
+    profile, picks = engine.synthesize_profile(engine.USER_PROFILE), _restaurants(1)
+    cache.put(explain_cache.explanation_key(picks[0], profile, EXPLAIN_MODEL), "cached")
+    assert list(iter_explanation_batches(picks, profile, "key", misses_only=True)) == [[(0, "fresh")]]
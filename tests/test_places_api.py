@@ -0,0 +1,137 @@
+# test_places_api.py — Pagination failures: never cached, stale data keeps serving
+
+import time
+
+import pytest
+
+import places_api
+from benchmarks import _StubResponse, _StubSession
+from places_api import (SPATIAL_INDEX_TTL, IncompleteResults, indexed_restaurants_within,
+                        load_all_restaurants, load_restaurants_progressive, tile_anchor)
+from restaurant_store import STORE_TTL, get_store
+
+
+class Page2Throttled(_StubSession):
+    """Page 1 answers normally; every later page is refused with OVER_QUERY_LIMIT."""
+
+    refused = 0
+
+    def get(self, url: str, params: dict = None, timeout=None, **kw):
+        if "pagetoken" in (params or {}):
+            self.refused += 1
+            return _StubResponse({"status": "OVER_QUERY_LIMIT"})
+        return super().get(url, params, timeout)
+
+
+def _age(seconds: float):
+    # Backdates every store entry (catalogues and tile indexes) by `seconds`
+    store = get_store()
+    with store._lock:
+        for key, (value, size, stored_at) in store._entries.items():
+            store._entries[key] = (value, size, stored_at - seconds)
+
+
+def _index(tile: tuple = tile_anchor(places_api.CENTER_LAT, places_api.CENTER_LNG)):
+    return get_store().peek(("index", tile))[0]
+
+
+def _settled(timeout: float = 5.0):
+    # Waits for background loads (store refreshes, tile loads) to finish
+    deadline = time.monotonic() + timeout
+    while get_store()._inflight or places_api._tile_loads:
+        assert time.monotonic() < deadline, "background load never finished"
+        time.sleep(0.01)
+
+
+def test_throttled_page_2_raises_throttled(city, serve):
+    serve(Page2Throttled(city))
+    with pytest.raises(IncompleteResults) as e:
+        load_all_restaurants("key")
+    assert e.value.throttled and e.value.pages == 1
+    assert get_store().stats()["entries"] == 0
+
+
+def test_throttled_page_2_is_shown_but_not_installed(city, serve):
+    serve(Page2Throttled(city))
+    seen = []
+    with pytest.raises(IncompleteResults) as e:
+        for restaurants in load_restaurants_progressive("key"):
+            seen.append(len(restaurants))
+    assert e.value.throttled
+    assert seen and seen[-1] <= 20                     # page 1 reached the caller
+    assert indexed_restaurants_within(1500) is None
+    assert get_store().stats()["entries"] == 0
+
+
+def test_throttled_refresh_keeps_stale_catalogue(city, serve):
+    serve(_StubSession(city))
+    fresh = load_all_restaurants("key")
+    _age(STORE_TTL + 1)
+
+    throttled = serve(Page2Throttled(city))
+    assert load_all_restaurants("key") is fresh       # stale, served at once
+    _settled()
+    assert throttled.refused                          # the refresh ran and was cut short
+    assert load_all_restaurants("key") is fresh       # the refresh did not overwrite it
+    assert get_store().stats()["entries"] == 1
+    assert _index() is None
+
+
+def test_throttled_refresh_keeps_stale_index(city, serve):
+    serve(_StubSession(city))
+    full  = [r["place_id"] for r in list(load_restaurants_progressive("key"))[-1]]
+    index = _index()
+    _age(SPATIAL_INDEX_TTL + 1)
+
+    throttled = serve(Page2Throttled(city))
+    served    = list(load_restaurants_progressive("key"))
+    assert [r["place_id"] for r in served[-1]] == full
+    _settled()
+    assert throttled.refused
+    assert _index() is index
+
+
+def test_narrower_load_does_not_shrink_a_fresh_index():
+    catalogue = [{"lat": 0.0, "lng": 0.0}]
+    wide      = places_api._install_index((0.0, 0.0), catalogue, 3000)
+    assert places_api._install_index((0.0, 0.0), catalogue, 2000) is wide
+    _age(SPATIAL_INDEX_TTL + 1)
+    narrow = places_api._install_index((0.0, 0.0), catalogue, 2000)
+    assert narrow is not wide and _index((0.0, 0.0)) is narrow
+
+
+def test_tile_indexes_share_the_store_budget(city, serve, monkeypatch):
+    serve(_StubSession(city))
+    list(load_restaurants_progressive("key"))
+    assert _index() is not None and get_store().stats()["bytes"] > 0
+
+    # No room for more than the newest entry: the first tile's index goes like any other
+    monkeypatch.setattr(get_store(), "max_bytes", 1)
+    lat, lng = places_api.CENTER_LAT + 0.01, places_api.CENTER_LNG
+    list(load_restaurants_progressive("key", lat=lat, lng=lng))
+    assert _index() is None
+    assert _index(tile_anchor(lat, lng)) is not None
+    assert get_store().stats()["evictions"] >= 2
+
+
+def test_stale_catalogue_is_served_without_opening_labels(city, serve, monkeypatch):
+    serve(_StubSession(city))
+    fresh = load_all_restaurants("key")
+    assert {places_api.opening_label(r) for r in fresh} - {places_api.UNKNOWN_HOURS}
+
+    later = time.time() + STORE_TTL + 1            # past both the store TTL and the labels' age limit
+    monkeypatch.setattr(time, "time", lambda: later)
+    serve(Page2Throttled(city))
+    stale = load_all_restaurants("key")             # served stale while a refresh runs
+    assert stale is fresh
+    assert {places_api.opening_label(r) for r in stale} == {places_api.UNKNOWN_HOURS}
+    _settled()
+
+
+def test_detail_labels_date_from_their_fetch(city, serve):
+    serve(_StubSession(city))
+    light    = load_all_restaurants("key")[0]
+    detailed = places_api.with_details([light], "key")[0]
+    assert detailed.detailed and detailed.status_at >= light.status_at
+    assert places_api.opening_label(detailed) == (detailed.opening_status, detailed.opening_hours)
+    assert places_api.opening_label(detailed.replace(status_at=0.0)) == places_api.UNKNOWN_HOURS
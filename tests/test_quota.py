@@ -0,0 +1,93 @@
+# test_quota.py — Token buckets: refusal, background shedding, FORYOU_QUOTAS parsing
+
+import asyncio
+
+import pytest
+
+import http_client
+import quota
+from quota import BACKGROUND, USER, QuotaExceeded, TokenBucket
+
+
+def _take(bucket: TokenBucket, lane: str, timeout: float = 0.0):
+    for _ in bucket.waits(lane, timeout):
+        pass
+
+
+def test_user_call_is_refused_once_the_burst_is_spent():
+    bucket = TokenBucket("details", rate=0.01, burst=2, daily=100)
+    _take(bucket, USER)
+    _take(bucket, USER)
+    with pytest.raises(QuotaExceeded) as e:
+        _take(bucket, USER)
+    assert e.value.status == "OVER_QUERY_LIMIT"
+
+
+def test_background_calls_leave_the_reserve_to_users():
+    bucket = TokenBucket("details", rate=0.01, burst=4, daily=100)   # reserve: one token
+    for _ in range(3):
+        _take(bucket, BACKGROUND)
+    with pytest.raises(QuotaExceeded):
+        _take(bucket, BACKGROUND)
+    _take(bucket, USER)                       # the reserved token is still there
+
+
+def test_cooldown_sheds_background_calls():
+    bucket = TokenBucket("nearbysearch", rate=100, burst=10, daily=100)
+    bucket.record("OVER_QUERY_LIMIT")
+    assert bucket.throttled() and bucket.shedding()
+    with pytest.raises(QuotaExceeded, match="shed"):
+        _take(bucket, BACKGROUND, timeout=10.0)
+
+
+def test_background_is_shed_near_the_daily_budget():
+    bucket = TokenBucket("chat", rate=100, burst=10, daily=10)
+    for _ in range(int(10 * quota.BACKGROUND_BUDGET)):
+        _take(bucket, USER)
+    assert bucket.shedding() and not bucket.throttled()
+    with pytest.raises(QuotaExceeded):
+        _take(bucket, BACKGROUND)
+    _take(bucket, USER)
+
+
+def test_spent_daily_budget_refuses_everyone():
+    bucket = TokenBucket("chat", rate=100, burst=10, daily=1)
+    _take(bucket, USER)
+    with pytest.raises(QuotaExceeded) as e:
+        _take(bucket, USER)
+    assert e.value.status == "OVER_DAILY_LIMIT"
+
+
+def test_refused_call_is_answered_without_being_sent(monkeypatch):
+    class Unreachable:
+        def get(self, *a, **kw):
+            raise AssertionError("sent despite the quota")
+    monkeypatch.setattr(http_client, "_session", Unreachable())
+    quota.record("nearbysearch", "OVER_QUERY_LIMIT")
+
+    async def prefetch():
+        with quota.lane(BACKGROUND):
+            return await http_client.aget_json("https://example.invalid/nearbysearch/json", {},
+                                               "nearbysearch")
+    assert asyncio.run(prefetch()) == {"status": "OVER_QUERY_LIMIT"}
+
+
+def test_parse_overrides_keeps_valid_entries():
+    assert quota._parse_overrides("details=20/40/10000, chat=5/3/20000") == {
+        "details": (20.0, 40, 10000),
+        "chat":    (5.0, 3, 20000),
+    }
+
+
+@pytest.mark.parametrize("spec", [
+    "details=0/40/10000",      # no rate
+    "details=-1/40/10000",
+    "details=nan/40/10000",
+    "details=20/0/10000",      # no burst
+    "details=20/40/-1",        # negative budget
+    "details=20/40",           # missing field
+    "details=fast/40/10000",
+    "details",
+])
+def test_parse_overrides_rejects_bad_entries(spec):
+    assert quota._parse_overrides(spec + ",chat=5/3/20000") == {"chat": (5.0, 3, 20000)}
@@ -0,0 +1,124 @@
+# test_restaurant_store.py — Single-flight loads, stale-while-revalidate, lanes
+
+import asyncio
+
+import pytest
+
+import quota
+from restaurant_store import RestaurantStore
+
+
+class Loader:
+    """Counts calls; each call waits for `release` (when given) and returns its number."""
+
+    def __init__(self, release: asyncio.Event = None):
+        self.calls   = 0
+        self.release = release
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        if self.release is not None:
+            await self.release.wait()
+        else:
+            await asyncio.sleep(0.01)
+        return [call]
+
+
+def _age(store: RestaurantStore, key, seconds: float):
+    value, size, stored_at = store._entries[key]
+    store._entries[key]    = (value, size, stored_at - seconds)
+
+
+def test_concurrent_misses_share_one_load():
+    async def main():
+        store, load = RestaurantStore(), Loader()
+        results     = await asyncio.gather(*(store.aget_or_load(("k",), load) for _ in range(20)))
+        return store, load, results
+    store, load, results = asyncio.run(main())
+    assert load.calls == 1
+    assert all(r is results[0] for r in results)
+    assert store.stats()["coalesced"] == 19
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def main():
+        store = RestaurantStore(ttl=60)
+        store.put(("k",), ["old"])
+        _age(store, ("k",), 61)
+        load    = Loader()
+        results = await asyncio.gather(*(store.aget_or_load(("k",), load) for _ in range(10)))
+        await asyncio.gather(*store._tasks)
+        return store, load, results
+    store, load, results = asyncio.run(main())
+    assert all(r == ("old",) for r in results)
+    assert load.calls == 1
+    assert store.get(("k",)) == (1,)
+
+
+def test_user_caller_does_not_follow_a_background_load():
+    async def main():
+        store, release = RestaurantStore(), asyncio.Event()
+        background     = Loader(release)
+        with quota.lane(quota.BACKGROUND):
+            prefetch = asyncio.ensure_future(store.aget_or_load(("k",), background))
+        await asyncio.sleep(0)
+        user  = Loader()
+        value = await asyncio.wait_for(store.aget_or_load(("k",), user), 1.0)
+        release.set()
+        await prefetch
+        return background, user, value
+    background, user, value = asyncio.run(main())
+    assert (background.calls, user.calls) == (1, 1)
+    assert value == (1,)
+
+
+def test_background_caller_follows_a_running_load():
+    async def main():
+        store, load = RestaurantStore(), Loader()
+        first = asyncio.ensure_future(store.aget_or_load(("k",), load))
+        await asyncio.sleep(0)
+        with quota.lane(quota.BACKGROUND):
+            second = await store.aget_or_load(("k",), load)
+        return load, await first, second
+    load, first, second = asyncio.run(main())
+    assert load.calls == 1 and first is second
+
+
+def test_cancelled_follower_does_not_cancel_the_load():
+    async def main():
+        store, release = RestaurantStore(), asyncio.Event()
+        load           = Loader(release)
+        leader   = asyncio.ensure_future(store.aget_or_load(("k",), load))
+        follower = asyncio.ensure_future(store.aget_or_load(("k",), load))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        release.set()
+        return store, load, await leader
+    store, load, value = asyncio.run(main())
+    assert load.calls == 1 and value == (1,)
+    assert store.get(("k",)) == (1,)
+
+
+def test_failed_load_reaches_followers_and_is_not_stored():
+    async def main():
+        store = RestaurantStore()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("page 2 refused")
+        results = await asyncio.gather(*(store.aget_or_load(("k",), failing) for _ in range(3)),
+                                       return_exceptions=True)
+        return store, results
+    store, results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert store.stats()["entries"] == 0 and not store._inflight
+
+
+def test_results_failing_keep_are_returned_not_stored():
+    store = RestaurantStore()
+    value = asyncio.run(store.aget_or_load(("k",), Loader(), keep=lambda v: False))
+    assert value == (1,)
+    assert store.stats()["entries"] == 0
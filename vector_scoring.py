@@ -0,0 +1,145 @@
+# vector_scoring.py — NumPy scoring path for large candidate sets
+# Same components, rounding and threshold as engine.score_restaurants, computed on
+# columnar arrays (rating, reviews_count, price_level, distance_km) plus a
+# restaurant × place-type membership matrix.
+
+import math
+
+import numpy as np
+
+from engine import FOOD_TYPES, MIN_SCORE_THRESHOLD, VENUE_BLOCKER_TYPES, _jitter, compiled_profile
+
+_PROOF_DENOM = math.log10(5000)
+
+
+class CandidateArrays:
+    """Columnar view of a restaurant list; build once per catalogue, score many times."""
+
+    __slots__ = ("restaurants", "names", "rating", "reviews", "price", "distance",
+                 "type_index", "types")
+
+    def __init__(self, restaurants: list):
+        self.restaurants = restaurants
+        self.names       = np.array([r["name"] for r in restaurants], dtype=object)
+        self.rating      = np.array([r.get("rating", 0.0) for r in restaurants], dtype=np.float64)
+        self.reviews     = np.array([r.get("reviews_count", 0) for r in restaurants], dtype=np.float64)
+        self.price       = np.array([r.get("price_level", 2) for r in restaurants], dtype=np.float64)
+        self.distance    = np.array([r.get("distance_km", 0.0) for r in restaurants], dtype=np.float64)
+
+        self.type_index = {}
+        rows, cols = [], []
+        for i, r in enumerate(restaurants):
+            for t in set(r.get("types", [])):
+                rows.append(i)
+                cols.append(self.type_index.setdefault(t, len(self.type_index)))
+        self.types = np.zeros((len(restaurants), len(self.type_index)), dtype=bool)
+        self.types[rows, cols] = True
+
+    def __len__(self):
+        return len(self.restaurants)
+
+    def has_any(self, type_names) -> np.ndarray:
+        """Boolean mask: restaurant has at least one of `type_names`."""
+        cols = [self.type_index[t] for t in type_names if t in self.type_index]
+        if not cols:
+            return np.zeros(len(self), dtype=bool)
+        return self.types[:, cols].any(axis=1)
+
+
+def component_scores(arrays: CandidateArrays, profile: dict) -> tuple:
+    """Returns (cuisine, rating, price, distance) score arrays, rounded like engine._*_score."""
+    type_affinity = compiled_profile(profile).type_affinity
+    aff_vec = np.zeros(len(arrays.type_index), dtype=np.float64)
+    for t, col in arrays.type_index.items():
+        aff_vec[col] = type_affinity.get(t, 0.0)
+    if aff_vec.size:
+        best = np.where(arrays.types, aff_vec, 0.0).max(axis=1)
+    else:
+        best = np.zeros(len(arrays))
+    c_cuisine = np.round(best * 40, 2)
+
+    rating_norm = np.clip(arrays.rating - 4.0, 0.0, 1.0)
+    proof_boost = np.minimum(np.log10(np.maximum(arrays.reviews, 1)) / _PROOF_DENOM, 1.0) * 5
+    c_rating    = np.round(rating_norm * 25 + proof_boost, 2)
+
+    diff    = np.minimum(np.abs(arrays.price - profile["price_preference"]), 3)
+    c_price = np.select([diff == 0, diff == 1, diff == 2], [20.0, 12.0, 4.0], 0.0)
+
+    c_distance = np.round(np.maximum(0.0, 10 - arrays.distance * 3.2), 2)
+    return c_cuisine, c_rating, c_price, c_distance
+
+
+def eligible_mask(arrays: CandidateArrays, profile: dict, exclude: set = None) -> np.ndarray:
+    """Venue, dislike and exclusion filters from score_restaurants as one mask."""
+    compiled = compiled_profile(profile)
+    mask = arrays.has_any(FOOD_TYPES) & ~arrays.has_any(VENUE_BLOCKER_TYPES)
+    mask &= ~arrays.has_any(compiled.disliked)
+    if exclude:
+        mask &= ~np.isin(arrays.names, list(exclude))
+    return mask
+
+
+def mode_mask(arrays: CandidateArrays, profile: dict, mode: str) -> np.ndarray:
+    mode_req, mode_exc = compiled_profile(profile).mode_filters.get(mode, (frozenset(), frozenset()))
+    mask = np.ones(len(arrays), dtype=bool)
+    if mode_req:
+        mask &= arrays.has_any(mode_req)
+    if mode_exc:
+        mask &= ~arrays.has_any(mode_exc)
+    return mask
+
+
+def scored_candidates_np(restaurants: list, profile: dict, exclude: set, mode: str,
+                         fallback_mode: str = None, jitter_seed: str = None,
+                         arrays: CandidateArrays = None) -> tuple:
+    """
+    Array version of engine._scored_candidates, same (primary, fallback) contract.
+    Pass `arrays` to reuse a catalogue that is already built.
+    """
+    if arrays is None:
+        arrays = CandidateArrays(restaurants)
+    if not len(arrays):
+        return [], []
+    c_cuisine, c_rating, c_price, c_distance = component_scores(arrays, profile)
+    raw  = c_cuisine + c_rating + c_price + c_distance
+    base = eligible_mask(arrays, profile, exclude) & (raw >= MIN_SCORE_THRESHOLD)
+
+    in_primary  = base & mode_mask(arrays, profile, mode)
+    in_fallback = base & mode_mask(arrays, profile, fallback_mode) if fallback_mode else np.zeros_like(base)
+    keep = np.flatnonzero(in_primary | in_fallback)
+    if not keep.size:
+        return [], []
+
+    jitter = np.array([_jitter(arrays.restaurants[i], jitter_seed) for i in keep.tolist()])
+    final  = np.round(np.minimum(raw[keep] + jitter, 99), 1)
+
+    primary, fallback = [], []
+    for j, i in enumerate(keep.tolist()):
+        cand = (float(final[j]), i, arrays.restaurants[i],
+                (float(c_cuisine[i]), float(c_rating[i]), float(c_price[i]), float(c_distance[i])))
+        if in_primary[i]:
+            primary.append(cand)
+        if in_fallback[i]:
+            fallback.append(cand)
+    return primary, fallback
+
+
+def mode_candidates_np(restaurants: list, profile: dict, modes: tuple) -> dict:
+    """Array version of engine._mode_candidates: one scoring pass, one mask per mode."""
+    arrays = CandidateArrays(restaurants)
+    if not len(arrays):
+        return {m: [] for m in modes}
+    c_cuisine, c_rating, c_price, c_distance = component_scores(arrays, profile)
+    raw  = c_cuisine + c_rating + c_price + c_distance
+    base = eligible_mask(arrays, profile) & (raw >= MIN_SCORE_THRESHOLD)
+
+    by_mode = {}
+    for m in modes:
+        keep = np.flatnonzero(base & mode_mask(arrays, profile, m))
+        keep = keep[np.argsort(-raw[keep], kind="stable")]   # ties stay in catalogue order
+        by_mode[m] = [
+            (float(raw[i]), i, arrays.restaurants[i],
+             (float(c_cuisine[i]), float(c_rating[i]), float(c_price[i]), float(c_distance[i])))
+            for i in keep.tolist()
+        ]
+    return by_mode